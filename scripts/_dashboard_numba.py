@@ -0,0 +1,41 @@
+"""
+Forward fill for the incremental CSV reader of timeseries_plotly_optimised.py,
+compiled with numba when it is installed and vectorized NumPy otherwise.
+"""
+import numpy as np
+
+from _numba_compat import HAVE_NUMBA, njit, prange
+
+
+@njit(parallel=True, cache=True)
+def ffill_columns(a, seed):
+    """
+    Forward-fill NaNs down each column of the 2D array a, in place.
+
+    seed holds the value carried into the first row of each column (NaN for none).
+    Columns are independent, so they are filled in parallel.
+    """
+    n, m = a.shape
+    for j in prange(m):
+        last = seed[j]
+        for i in range(n):
+            v = a[i, j]
+            if np.isnan(v):
+                a[i, j] = last
+            else:
+                last = v
+
+
+def _ffill_columns_numpy(a, seed):
+    """Same as ffill_columns, with NumPy index propagation instead of a loop."""
+    # Put the seed on top so it is carried into the leading NaNs
+    b = np.vstack([seed, a])
+    # Row index of the last non-NaN value at or above each cell
+    idx = np.where(np.isnan(b), 0, np.arange(b.shape[0])[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    a[:] = np.take_along_axis(b, idx, axis=0)[1:]
+
+
+if not HAVE_NUMBA:
+    # The plain Python loop above would visit every cell one by one
+    ffill_columns = _ffill_columns_numpy
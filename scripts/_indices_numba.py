@@ -0,0 +1,52 @@
+"""
+Small compiled kernels for the instability indices in plot_skewt.py.
+
+Both functions take plain float arrays in hPa/degC (no pint units) and return a
+float, or NaN when the profile does not reach the required levels. If numba is
+not installed the same code runs as regular NumPy.
+"""
+import numpy as np
+
+from _numba_compat import njit
+
+
+# fastmath is left off on purpose: it lets the compiler assume there are no NaNs,
+# and NaN is how missing data and out-of-range levels are reported here.
+@njit(cache=True)
+def _interp_levels(levels, p, y):
+    """Linearly interpolate y to the given pressure levels, ignoring NaN points."""
+    valid = ~(np.isnan(p) | np.isnan(y))
+    p = p[valid]
+    y = y[valid]
+    # Sort by increasing pressure so the bounding points can be found with searchsorted
+    order = np.argsort(p)
+    p = p[order]
+    y = y[order]
+
+    out = np.full(levels.shape[0], np.nan)
+    n = p.shape[0]
+    for i in range(levels.shape[0]):
+        x = levels[i]
+        idx = np.searchsorted(p, x)
+        if idx < n and p[idx] == x:
+            out[i] = y[idx]
+        elif 0 < idx < n:
+            x0, x1 = p[idx - 1], p[idx]
+            y0, y1 = y[idx - 1], y[idx]
+            out[i] = y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+    return out
+
+
+@njit(cache=True)
+def k_index_from_profile(p, T, Td):
+    """K-Index from T at 850/700/500 hPa and Td at 850/700 hPa."""
+    t = _interp_levels(np.array([850.0, 700.0, 500.0]), p, T)
+    td = _interp_levels(np.array([850.0, 700.0]), p, Td)
+    return (t[0] - t[2]) + td[0] - (t[1] - td[1])
+
+
+@njit(cache=True)
+def lifted_index_from_profile(p, T, parcel_t):
+    """Lifted Index: environmental minus parcel temperature at 500 hPa."""
+    levels = np.array([500.0])
+    return _interp_levels(levels, p, T)[0] - _interp_levels(levels, p, parcel_t)[0]
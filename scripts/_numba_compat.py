@@ -0,0 +1,16 @@
+"""
+numba's njit and prange, or stand-ins that leave the code as plain Python/NumPy
+when numba is not installed. HAVE_NUMBA tells which one was imported.
+"""
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # No numba: return the function unchanged
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
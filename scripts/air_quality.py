@@ -1,7 +1,8 @@
+import os
+import sys
 import time
 import board
 import busio
-import csv
 from datetime import datetime, timezone
 from digitalio import DigitalInOut, Direction, Pull
 from adafruit_pm25.i2c import PM25_I2C
@@ -20,6 +21,9 @@ pm25 = PM25_I2C(i2c, reset_pin)
 # Path to CSV file
 csv_file_path = "/home/dimitris/weather_station/weather_station_data.csv"
 
+# Keep one append-only descriptor open instead of reopening the CSV every reading
+csv_fd = os.open(csv_file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
 print("Found PM2.5 sensor, reading data...")
 
 while True:
@@ -37,39 +41,40 @@ while True:
     pm25_value = aqdata["pm25 standard"]    # PM2.5
     pm10_value = aqdata["pm100 standard"]   # PM10.0
 
-    # Optional: print sensor readings to the console for debugging
-    print()
-    print("Concentration Units (standard)")
-    print("---------------------------------------")
-    print("PM 1.0: %d\tPM2.5: %d\tPM10: %d" % (pm1_value, pm25_value, pm10_value))
-    print("Concentration Units (environmental)")
-    print("---------------------------------------")
-    print("PM 1.0: %d\tPM2.5: %d\tPM10: %d" % (aqdata["pm10 env"], aqdata["pm25 env"], aqdata["pm100 env"]))
-    print("---------------------------------------")
-    print("Particles > 0.3um / 0.1L air:", aqdata["particles 03um"])
-    print("Particles > 0.5um / 0.1L air:", aqdata["particles 05um"])
-    print("Particles > 1.0um / 0.1L air:", aqdata["particles 10um"])
-    print("Particles > 2.5um / 0.1L air:", aqdata["particles 25um"])
-    print("Particles > 5.0um / 0.1L air:", aqdata["particles 50um"])
-    print("Particles > 10 um / 0.1L air:", aqdata["particles 100um"])
-    print("---------------------------------------")
+    # Optional: print sensor readings to the console for debugging (one write per reading)
+    sys.stdout.write("\n".join([
+        "",
+        "Concentration Units (standard)",
+        "---------------------------------------",
+        "PM 1.0: %d\tPM2.5: %d\tPM10: %d" % (pm1_value, pm25_value, pm10_value),
+        "Concentration Units (environmental)",
+        "---------------------------------------",
+        "PM 1.0: %d\tPM2.5: %d\tPM10: %d" % (aqdata["pm10 env"], aqdata["pm25 env"], aqdata["pm100 env"]),
+        "---------------------------------------",
+        "Particles > 0.3um / 0.1L air: %d" % aqdata["particles 03um"],
+        "Particles > 0.5um / 0.1L air: %d" % aqdata["particles 05um"],
+        "Particles > 1.0um / 0.1L air: %d" % aqdata["particles 10um"],
+        "Particles > 2.5um / 0.1L air: %d" % aqdata["particles 25um"],
+        "Particles > 5.0um / 0.1L air: %d" % aqdata["particles 50um"],
+        "Particles > 10 um / 0.1L air: %d" % aqdata["particles 100um"],
+        "---------------------------------------",
+        "",
+    ]))
 
-    pm1_value_cal=pm1_value/10.0
-    pm25_value_cal=pm25_value/10.0
-    pm10_value_cal=pm10_value/10.0
     # Get the current timestamp in the required format
     #timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
-    # Create a row with the timestamp in column 1, 12 empty columns (columns 2-13),
-    # and then PM1.0, PM2.5, and PM10.0 in columns 14, 15, and 16.
-    row = [timestamp] + [""] * 12 + [pm1_value_cal, pm25_value_cal, pm10_value_cal]
+    # The row has the timestamp in column 1, 12 empty columns (columns 2-13), and then
+    # the calibrated (raw / 10) PM1.0, PM2.5, and PM10.0 in columns 14, 15, and 16.
+    # The sensor reports integers, so one decimal is exact. CRLF matches the line
+    # ending csv.writer used to produce.
+    line = (f"{timestamp},,,,,,,,,,,,,"
+            f"{pm1_value / 10:.1f},{pm25_value / 10:.1f},{pm10_value / 10:.1f}\r\n")
 
     # Append the row to the CSV file
     try:
-        with open(csv_file_path, "a", newline="") as csvfile:
-            csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(row)
-        print("Data written to CSV:", row)
+        os.write(csv_fd, line.encode())
+        print("Data written to CSV:", line.rstrip())
     except Exception as e:
         print("Failed to write to CSV:", e)
@@ -1,25 +1,14 @@
 #!/usr/bin/env python3
-import subprocess
-import time
+import os
 import sys
 
 # Path to your main script
 SCRIPT = "timeseries_plotly_optimised.py"
-# Delay before restarting (seconds)
-RESTART_DELAY = 2
-
-def run_forever():
-    while True:
-        print(f"[Launcher] Starting {SCRIPT} ...")
-        proc = subprocess.Popen([sys.executable, SCRIPT])
-        proc.wait()
-        exit_code = proc.returncode
-        print(f"[Launcher] {SCRIPT} exited with code {exit_code}. Restarting in {RESTART_DELAY}s...")
-        time.sleep(RESTART_DELAY)
 
+# Restarts are handled by auto_plotly.sh (same loop as the other auto_*.sh scripts),
+# so this launcher no longer stays resident next to the dashboard. It replaces
+# itself with the dashboard process, keeping only one interpreter in memory.
 if __name__ == "__main__":
-    try:
-        run_forever()
-    except KeyboardInterrupt:
-        print("\n[Launcher] Received Ctrl+C; exiting.")
-        sys.exit(0)
+    print(f"[Launcher] Starting {SCRIPT} ...")
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, SCRIPT])
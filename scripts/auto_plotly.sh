@@ -0,0 +1,6 @@
+while true; do
+  echo "Starting timeseries_plotly_optimised.py"
+  python3 timeseries_plotly_optimised.py
+  echo "Το script σταμάτησε με κωδικό εξόδου $?. Επανεκκίνηση σε 2 δευτερόλεπτα..."
+  sleep 2
+done
@@ -6,7 +6,8 @@ This script downloads ERA5 reanalysis data to calculate and plot the temperature
 anomaly at 850 hPa over Europe.
 
 It performs the following steps:
-1. Downloads the monthly climatology (1975-2005) for temperature at 850 hPa.
+1. Downloads the monthly climatology (1975-2005) for temperature at 850 hPa
+   and reduces it once to a 12-month mean, which is cached on disk.
 2. Downloads the temperature at 850 hPa for the most recent available day at 12:00 UTC.
 3. Calculates the anomaly by subtracting the corresponding month's climatology
    from the recent day's data.
@@ -17,20 +18,26 @@ Requirements:
   You need a CDS account and an API key set up in your ~/.cdsapirc file.
   Instructions: https://cds.climate.copernicus.eu/api-how-to
 - xarray: For data manipulation.
+- dask: For combining the per-year climatology files and reducing them lazily.
+- flox: For the grouped monthly mean of the climatology.
 - numpy: For numerical operations.
 - matplotlib: For plotting.
 - cartopy: For map projections and geographical features.
 
 Installation:
-pip install cdsapi xarray numpy matplotlib cartopy
+pip install cdsapi xarray dask flox numpy matplotlib cartopy
 """
 import cdsapi
 import xarray as xr
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import BoundaryNorm
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+import hashlib
+import json
 import os
 
 # --- Configuration ---
@@ -39,18 +46,73 @@ import os
 EUROPE_AREA = [75, -35, 20, 57] 
 CLIMATOLOGY_YEARS = [str(y) for y in range(1975, 2006)]
 CLIMATOLOGY_FILE = 't850_climatology_1975-2005.nc'
-LATEST_DAY_FILE_TEMPLATE = 't850_latest_{date_str}.nc'
+# Derived file holding the 12 long-term monthly means of the climatology.
+MONTHLY_CLIMATOLOGY_FILE = 't850_monthly_clim_1975-2005.nc'
+# Sidecar file recording the area/years the cached climatology was downloaded for.
+CLIMATOLOGY_META_FILE = 't850_climatology_1975-2005.json'
+# Short key of the current area, embedded in the daily file names so that files
+# downloaded for a different domain are never picked up again.
+AREA_KEY = hashlib.md5(json.dumps(EUROPE_AREA).encode('utf-8')).hexdigest()[:8]
+# The climatology is retrieved one year per request, several requests at a time.
+# Keep the concurrency low to stay within the CDS fair-use queueing limits.
+CLIMATOLOGY_PART_TEMPLATE = 't850_clim_{area_key}_{year}.nc'
+CLIMATOLOGY_MAX_WORKERS = 4
+# Dask chunk sizes used when reading the climatology (one year per chunk).
+CLIMATOLOGY_CHUNKS = {'valid_time': 12, 'latitude': 200, 'longitude': 200}
+LATEST_DAY_FILE_TEMPLATE = 't850_latest_{area_key}_{date_str}.nc'
+LATEST_DAY_OFFSETS = range(5, 10) # Try from 5 days ago up to 9 days ago
+# Number of grid cells averaged together along each axis before plotting.
+PLOT_COARSEN_FACTOR = 3
 
-def download_climatology():
+def climatology_metadata():
     """
-    Downloads the monthly mean temperature at 850hPa for the climatology
-    period (1975-2005) if the data file doesn't already exist.
+    Returns the configuration the cached climatology file depends on.
     """
-    if os.path.exists(CLIMATOLOGY_FILE):
-        print(f"Climatology file '{CLIMATOLOGY_FILE}' already exists. Skipping download.")
-        return
+    return {'area': EUROPE_AREA, 'years': CLIMATOLOGY_YEARS}
 
-    print("Downloading monthly climatology data (1975-2005)...")
+def climatology_is_current():
+    """
+    Checks whether the cached climatology file was downloaded for the current
+    area and years, using the metadata stored next to it.
+    """
+    if not os.path.exists(CLIMATOLOGY_FILE) or not os.path.exists(CLIMATOLOGY_META_FILE):
+        return False
+    try:
+        with open(CLIMATOLOGY_META_FILE) as f:
+            return json.load(f) == climatology_metadata()
+    except (OSError, ValueError):
+        return False
+
+def latest_day_filename(target_date):
+    """
+    Returns the file name used for the daily T850 download of the given date.
+    """
+    return LATEST_DAY_FILE_TEMPLATE.format(area_key=AREA_KEY, date_str=target_date.strftime('%Y-%m-%d'))
+
+def remove_stale_latest_files():
+    """
+    Removes daily files that can no longer be used: those downloaded for a
+    different area and those older than the download window.
+    """
+    now_utc = datetime.now(timezone.utc)
+    wanted = {latest_day_filename(now_utc - timedelta(days=i)) for i in LATEST_DAY_OFFSETS}
+    for f in os.listdir('.'):
+        if f.startswith('t850_latest_') and f not in wanted:
+            print(f"Removing stale daily file: {f}")
+            os.remove(f)
+
+def download_climatology_year(year):
+    """
+    Downloads the monthly mean temperature at 850hPa for a single year of the
+    climatology period. Each call uses its own CDS client so that several years
+    can be requested concurrently.
+    """
+    part_file = CLIMATOLOGY_PART_TEMPLATE.format(area_key=AREA_KEY, year=year)
+    if os.path.exists(part_file):
+        print(f"Climatology part '{part_file}' already exists. Skipping download.")
+        return part_file
+
+    print(f"Downloading climatology data for {year}...")
     c = cdsapi.Client()
     c.retrieve(
         'reanalysis-era5-pressure-levels-monthly-means',
@@ -58,15 +120,67 @@ def download_climatology():
             'product_type': 'monthly_averaged_reanalysis',
             'variable': 'temperature',
             'pressure_level': '850',
-            'year': CLIMATOLOGY_YEARS,
+            'year': [year],
             'month': [f'{m:02d}' for m in range(1, 13)],
             'time': '00:00',
             'area': EUROPE_AREA,
             'format': 'netcdf',
         },
-        CLIMATOLOGY_FILE)
+        part_file)
+    print(f"Climatology data for {year} downloaded.")
+    return part_file
+
+def download_climatology():
+    """
+    Downloads the monthly mean temperature at 850hPa for the climatology
+    period (1975-2005) if the data file doesn't already exist.
+
+    The years are requested concurrently and merged into a single file once
+    all of them are available.
+    """
+    if climatology_is_current():
+        print(f"Climatology file '{CLIMATOLOGY_FILE}' already exists. Skipping download.")
+        return
+
+    print("Downloading monthly climatology data (1975-2005)...")
+    with ThreadPoolExecutor(max_workers=CLIMATOLOGY_MAX_WORKERS) as executor:
+        part_files = list(executor.map(download_climatology_year, CLIMATOLOGY_YEARS))
+
+    print("Combining the yearly climatology files...")
+    with xr.open_mfdataset(part_files, combine='by_coords', parallel=True) as ds:
+        ds.to_netcdf(CLIMATOLOGY_FILE)
+    with open(CLIMATOLOGY_META_FILE, 'w') as f:
+        json.dump(climatology_metadata(), f)
+    for part_file in part_files:
+        os.remove(part_file)
+    # Any previously derived monthly means belong to the old download.
+    if os.path.exists(MONTHLY_CLIMATOLOGY_FILE):
+        os.remove(MONTHLY_CLIMATOLOGY_FILE)
     print("Climatology download complete.")
 
+def compute_monthly_climatology():
+    """
+    Reduces the downloaded climatology to the long-term mean of each month and
+    saves it to disk, so that later runs only need to open the small derived
+    file instead of averaging the full 31-year record again.
+    """
+    if os.path.exists(MONTHLY_CLIMATOLOGY_FILE):
+        print(f"Monthly climatology file '{MONTHLY_CLIMATOLOGY_FILE}' already exists. Skipping computation.")
+        return
+
+    print("Computing monthly climatology means...")
+    # Load climatology lazily in yearly chunks so the monthly mean is computed
+    # blockwise by dask instead of holding the whole 31-year cube in memory.
+    # The grouped mean is delegated to flox, which reduces all 12 months in a
+    # single pass rather than looping over the month groups.
+    with xr.open_dataset(CLIMATOLOGY_FILE, chunks=CLIMATOLOGY_CHUNKS) as ds_clim:
+        # float32 halves the memory traffic of the reduction; its precision is
+        # far finer than anything the anomaly map can show.
+        ds_clim['t'] = ds_clim.t.astype('float32')
+        monthly_clim = ds_clim.groupby('valid_time.month').mean('valid_time', method='cohorts', engine='flox')
+        monthly_clim.to_netcdf(MONTHLY_CLIMATOLOGY_FILE)
+    print("Monthly climatology saved.")
+
 def download_latest_day():
     """
     Downloads the T850 data for the most recent available day.
@@ -75,10 +189,10 @@ def download_latest_day():
     it succeeds.
     """
     c = cdsapi.Client()
-    for i in range(5, 10): # Try from 5 days ago up to 9 days ago
+    for i in LATEST_DAY_OFFSETS:
         target_date = datetime.now(timezone.utc) - timedelta(days=i)
         date_str = target_date.strftime('%Y-%m-%d')
-        latest_day_file = LATEST_DAY_FILE_TEMPLATE.format(date_str=date_str)
+        latest_day_file = latest_day_filename(target_date)
 
         if os.path.exists(latest_day_file):
             print(f"Latest day file '{latest_day_file}' already exists. Skipping download.")
@@ -116,15 +230,17 @@ def calculate_and_plot_anomaly(latest_day_file, latest_date):
     Calculates the temperature anomaly and plots it on a map.
     """
     print("Loading datasets with xarray...")
-    # Load climatology and calculate the long-term mean for each month
-    ds_clim = xr.open_dataset(CLIMATOLOGY_FILE)
-    monthly_clim = ds_clim.groupby('valid_time.month').mean('valid_time')
+    # Load the precomputed long-term mean for each month.
+    # Both files are opened lazily (dask-backed): selecting the month, subtracting,
+    # downcasting and coarsening only build a task graph, which dask fuses and
+    # evaluates in a single pass when the anomaly is computed just before plotting.
+    monthly_clim = xr.open_dataset(MONTHLY_CLIMATOLOGY_FILE, chunks={})
 
     # Load the latest day's data
-    ds_latest = xr.open_dataset(latest_day_file)
+    ds_latest = xr.open_dataset(latest_day_file, chunks={})
     
     # --- Process latest day data to be 2D ---
-    t850_latest = ds_latest.t.squeeze(drop=True)
+    t850_latest = ds_latest.t.squeeze(drop=True).astype('float32', copy=False)
     if t850_latest.ndim != 2:
         raise ValueError(
             f"Error: Processed latest-day data is not 2D. Dims: {t850_latest.dims}"
@@ -135,7 +251,7 @@ def calculate_and_plot_anomaly(latest_day_file, latest_date):
     print(f"Calculating anomaly for month: {target_month}")
     t850_clim_month_raw = monthly_clim.sel(month=target_month).t
     # Squeeze the climatology data as well to ensure it is 2D
-    t850_clim_month = t850_clim_month_raw.squeeze(drop=True)
+    t850_clim_month = t850_clim_month_raw.squeeze(drop=True).astype('float32', copy=False)
     if t850_clim_month.ndim != 2:
          raise ValueError(
             f"Error: Processed climatology data is not 2D. Dims: {t850_clim_month.dims}"
@@ -144,6 +260,11 @@ def calculate_and_plot_anomaly(latest_day_file, latest_date):
     # Calculate the anomaly
     anomaly = t850_latest - t850_clim_month
 
+    # The 0.25 deg grid is far finer than the map can show, so average it onto
+    # 3x3 blocks before plotting to cut the number of cells to reproject.
+    anomaly = anomaly.coarsen(latitude=PLOT_COARSEN_FACTOR, longitude=PLOT_COARSEN_FACTOR, boundary='trim').mean()
+    anomaly = anomaly.compute()
+
     print("Plotting the anomaly map...")
     # --- Plotting ---
     fig = plt.figure(figsize=(12, 10))
@@ -161,13 +282,17 @@ def calculate_and_plot_anomaly(latest_day_file, latest_date):
     # Set fixed contour levels from -12 to 12 with a step of 2.
     levels = np.arange(-12, 13, 2)
     
-    # Plot the filled contours
-    contour = ax.contourf(
-        anomaly['longitude'], anomaly['latitude'], anomaly,
-        levels=levels,
-        cmap='RdBu_r',
+    # Plot the field as a single QuadMesh. The BoundaryNorm bins the colours at the
+    # contour levels, so the map keeps the banded look of contourf while avoiding
+    # the reprojection of thousands of contour polygons.
+    cmap = plt.get_cmap('RdBu_r')
+    norm = BoundaryNorm(levels, cmap.N, extend='both') # 'both' extends the colorbar for values outside the levels
+    mesh = ax.pcolormesh(
+        anomaly['longitude'], anomaly['latitude'], anomaly.values,
+        cmap=cmap,
+        norm=norm,
         transform=ccrs.PlateCarree(),
-        extend='both' # 'both' extends the colorbar for values outside the levels
+        shading='auto'
     )
     
     # Removed contour lines by commenting out the ax.contour() call.
@@ -180,7 +305,7 @@ def calculate_and_plot_anomaly(latest_day_file, latest_date):
     # )
 
     # EDIT: Shrunk the colorbar to make it shorter.
-    cbar = fig.colorbar(contour, ax=ax, orientation='vertical', pad=0.03, shrink=0.7)
+    cbar = fig.colorbar(mesh, ax=ax, orientation='vertical', pad=0.03, shrink=0.7, extend='both')
     cbar.set_label('Temperature Anomaly at 850 hPa (K)', fontsize=12)
 
     # EDIT: Removed gridlines.
@@ -196,23 +321,18 @@ def calculate_and_plot_anomaly(latest_day_file, latest_date):
 
 
 if __name__ == '__main__':
-    # For a clean run, it's best to delete the old daily file first
-    # as its data structure might differ from a fresh download.
-    # Also, if the EUROPE_AREA changes, old files must be deleted.
-    for f in os.listdir('.'):
-        if f.startswith('t850_latest_'):
-            print(f"Forcing a fresh download by removing old file: {f}")
-            os.remove(f)
-    # Also remove old climatology if area changes.
-    # A simple check is to see if the climatology file exists and if so,
-    # assume the area might have changed and remove it. A more robust check
-    # would be to store metadata, but this is sufficient for this script.
-    if os.path.exists(CLIMATOLOGY_FILE):
-        print(f"Domain area may have changed. Removing old climatology file: {CLIMATOLOGY_FILE}")
+    # Cached files are reused as long as they were downloaded for the current
+    # area; daily files carry the area key in their name and the climatology
+    # has its area/years stored in a sidecar metadata file.
+    remove_stale_latest_files()
+    if os.path.exists(CLIMATOLOGY_FILE) and not climatology_is_current():
+        print(f"Domain area or years changed. Removing old climatology file: {CLIMATOLOGY_FILE}")
         os.remove(CLIMATOLOGY_FILE)
-
+        if os.path.exists(MONTHLY_CLIMATOLOGY_FILE):
+            os.remove(MONTHLY_CLIMATOLOGY_FILE)
 
     download_climatology()
+    compute_monthly_climatology()
 
     latest_day_file, latest_date = download_latest_day()
 
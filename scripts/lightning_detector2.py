@@ -1,6 +1,8 @@
+import os
+import queue
 import sys
+import threading
 import time
-import csv
 import subprocess
 from datetime import datetime
 from DFRobot_AS3935_Lib import DFRobot_AS3935
@@ -34,7 +36,30 @@ sensor.set_noise_floor_lv1(2)
 sensor.set_watchdog_threshold(2)
 sensor.set_spike_rejection(2)
 
+# Keep one append-only descriptor open instead of reopening the CSV on every strike
+csv_file = "/home/dimitris/weather_station/weather_station_data.csv"
+csv_fd = os.open(csv_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
 
+# Camera captures take a second or more, so they run on a worker thread instead of
+# inside the GPIO callback; otherwise back-to-back strikes would be missed.
+cam_q = queue.Queue(maxsize=8)
+
+
+def _camera_worker():
+    while True:
+        img_filename = cam_q.get()
+        cmd = ["libcamera-still", "-n", "--immediate", "--hdr", "--denoise", "cdn_off",
+               "--autofocus-mode", "manual", "--lens-position", "0.05",
+               "--shutter", "500000", "--gain", "1", "--width", "1920", "--height", "1080",
+               "--nopreview", "-o", img_filename]
+        try:
+            subprocess.run(cmd, check=True)
+            print("Image captured and saved as:", img_filename)
+        except (subprocess.CalledProcessError, OSError) as e:
+            print("Failed to capture image:", e)
+
+
+threading.Thread(target=_camera_worker, daemon=True).start()
 
 
 def callback_handle(channel):
@@ -54,13 +79,11 @@ def callback_handle(channel):
         print("Timestamp for logging:", timestamp_csv)
         
         # Append the data to the CSV file.
-        csv_file = "/home/dimitris/weather_station/weather_station_data.csv"
         try:
-            # Prepare a row with 7 columns where only columns 1, 6 and 7 are filled.
-            row = [timestamp_csv, "", "", "", "", "Lightning is Detected", lightning_distKm]
-            with open(csv_file, mode="a", newline="") as file:
-                writer = csv.writer(file)
-                writer.writerow(row)
+            # Write a row with 7 columns where only columns 1, 6 and 7 are filled
+            # (CRLF, as csv.writer used to produce).
+            row = f"{timestamp_csv},,,,,Lightning is Detected,{lightning_distKm}\r\n"
+            os.write(csv_fd, row.encode())
             print("Data logged to CSV.")
         except Exception as e:
             print("Failed to write to CSV:", e)
@@ -69,12 +92,11 @@ def callback_handle(channel):
         # For the file name, we format the timestamp in a file-friendly manner.
         timestamp_img = now.strftime("%Y%m%d_%H%M%S")
         img_filename = f"/home/dimitris/weather_station/whole_sky_camera/THUNDER_{timestamp_img}.jpg"
-        bash_cmd = f"libcamera-still -n --immediate --hdr --denoise cdn_off --autofocus-mode manual --lens-position 0.05 --shutter 500000 --gain 1  --width 1920 --height 1080 --nopreview  -o {img_filename}"
+        # Hand the capture to the camera worker so the callback returns immediately
         try:
-            subprocess.run(bash_cmd, shell=True, check=True)
-            print("Image captured and saved as:", img_filename)
-        except subprocess.CalledProcessError as e:
-            print("Failed to capture image:", e)
+            cam_q.put_nowait(img_filename)
+        except queue.Full:
+            print("Camera busy, skipping image:", img_filename)
         
     elif intSrc == 2:
         print('Disturber discovered!')
@@ -1,25 +1,104 @@
-import socket
+import asyncio
+import atexit
+import os
+import signal
 
 HOST = ''  # Listen on all available interfaces
 PORT = 12345
 CSV_FILE = "/home/dimitris/weather_station/weather_station_data.csv"
+# Received samples are buffered in memory and written to the SD card at most
+# every FLUSH_INTERVAL seconds (or sooner if the buffer fills up).
+BUFFER_SIZE = 64 * 1024
+FLUSH_INTERVAL = 5  # seconds
+# Force the written data out to the SD card after this many received records.
+FSYNC_EVERY = 50
 
 # Ensure the directory exists
-import os
 os.makedirs(os.path.dirname(CSV_FILE), exist_ok=True)
 
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-    s.bind((HOST, PORT))
-    s.listen(5)
-    print("TCP Server listening on port", PORT)
+# Keep one append-only descriptor open for the lifetime of the server instead of
+# reopening the CSV per sample. The received bytes are already CSV lines, so they
+# are stored as-is without a decode/encode round trip.
+csv_fd = os.open(CSV_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+pending = bytearray()
+records_since_fsync = 0
+# Packets received by the client handlers wait here for the single CSV writer.
+# Created in main() so it belongs to the running event loop.
+queue = None
+
+
+def flush_pending(sync=False):
+    """Write the buffered records to the CSV, optionally fsyncing afterwards."""
+    global records_since_fsync
+    if pending:
+        os.write(csv_fd, pending)
+        pending.clear()
+    if sync or records_since_fsync >= FSYNC_EVERY:
+        os.fsync(csv_fd)
+        records_since_fsync = 0
+
+
+def close_csv():
+    # Keep packets that were already acknowledged but not yet taken by csv_writer
+    while queue is not None and not queue.empty():
+        pending.extend(queue.get_nowait())
+    flush_pending(sync=True)
+    os.close(csv_fd)
+
+
+atexit.register(close_csv)  # Write out whatever is still buffered
+
+
+async def handle_client(reader, writer):
+    """Read one packet from a sensor client, queue it for the CSV and acknowledge it."""
+    print("Connected by", writer.get_extra_info("peername"))
+    try:
+        data = await reader.read(1024)
+        if data:
+            # Queue received data; csv_writer appends it in arrival order
+            await queue.put(data)
+            # Send a simple acknowledgement
+            writer.write(b"OK")
+            await writer.drain()
+    except ConnectionError as e:
+        print("Connection error:", e)
+    finally:
+        writer.close()
+
+
+async def csv_writer():
+    """Single consumer that moves queued packets into the CSV buffer and flushes it."""
+    global records_since_fsync
+    loop = asyncio.get_running_loop()
+    last_flush = loop.time()
     while True:
-        conn, addr = s.accept()
-        with conn:
-            print("Connected by", addr)
-            data = conn.recv(1024)
-            if data:
-                # Append received data to CSV file
-                with open(CSV_FILE, "a") as f:
-                    f.write(data.decode('utf-8'))
-                # Send a simple acknowledgement
-                conn.sendall(b"OK")
+        # Wait for data, but wake up in time for the next periodic flush.
+        timeout = max(FLUSH_INTERVAL - (loop.time() - last_flush), 0)
+        try:
+            data = await asyncio.wait_for(queue.get(), timeout)
+            pending.extend(data)
+            records_since_fsync += 1
+        except asyncio.TimeoutError:
+            pass
+        if len(pending) >= BUFFER_SIZE or loop.time() - last_flush >= FLUSH_INTERVAL:
+            flush_pending()
+            last_flush = loop.time()
+
+
+async def main():
+    global queue
+    queue = asyncio.Queue()
+    # Turn SIGTERM (e.g. from systemd or kill) into a normal exit so the buffer is flushed.
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    # Each client connection is handled in its own coroutine, so slow or concurrent
+    # sensors no longer wait for each other.
+    server = await asyncio.start_server(handle_client, HOST or None, PORT)
+    print("TCP Server listening on port", PORT)
+    writer_task = asyncio.create_task(csv_writer())
+    async with server:
+        await stop.wait()
+    writer_task.cancel()
+
+
+asyncio.run(main())
@@ -1,4 +1,4 @@
-import os, glob, base64
+import os, glob, base64, io
 from dotenv import load_dotenv
 
 # Load environment variables from the .env file
@@ -6,6 +6,7 @@ load_dotenv()
 
 import asyncio
 import telegram
+from asyncinotify import Inotify, Mask
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -23,36 +24,147 @@ bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
 
 CSV_PATH = "weather_station_data.csv"
 
-def load_all_data():
-    """Load the entire CSV (no 24-hour filter) and localize timestamps as UTC."""
-    try:
-        df = pd.read_csv(
-            CSV_PATH,
-            parse_dates=["timestamp"],
-            date_format="%Y-%m-%d %H:%M:%S",
-            low_memory=False
-        )
-        df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
-        return df
-    except Exception as e:
-        print("Error loading data:", e)
-        return pd.DataFrame()
+# UTC hours at which the daily minimum and maximum temperature notifications are sent
+MIN_TEMP_HOUR = 7
+MAX_TEMP_HOUR = 15
+# Fallback check interval (seconds) while the CSV cannot be watched for changes
+POLL_INTERVAL = 19
+
+# Columns that do not hold numeric sensor readings
+NON_NUMERIC_COLS = ["timestamp", "Lightning Detection (AS3935)", "Rain Event (LM393)"]
+# The only columns the notification checks look at; the rest are dropped right after parsing.
+NOTIFICATION_COLS = [
+    "timestamp",
+    "Temperature (MCP9808) (°C)",
+    "Lightning Distance (AS3935) (km)",
+    "Rain Event (LM393)"
+]
+# The rain sensor has logged its states with varying spelling ("No Rain", "no Rain",
+# "NoRain", ...), so they are mapped onto two fixed categories while parsing.
+RAIN_EVENT_DTYPE = pd.CategoricalDtype(["No Rain", "Rain"])
+NO_RAIN_CODE, RAIN_CODE = 0, 1
+_RAIN_EVENT_CODES = {"norain": NO_RAIN_CODE, "rain": RAIN_CODE}
+# All checks look at most 24 hours back (the daily min/max since midnight UTC included),
+# so older rows are dropped from the in-memory cache.
+CACHE_WINDOW = timedelta(hours=24)
+# Step size used when searching backwards for the start of the last 24 hours.
+TAIL_BLOCK_SIZE = 256 * 1024
+
+# Rows of the last 24 hours, the CSV header and the byte offset of the CSV read so far.
+_cache = {"df": None, "names": None, "offset": 0}
+# Running MCP9808 minimum/maximum since midnight UTC, updated as new rows are parsed.
+_daily_stats = {"date": None, "min": np.inf, "max": -np.inf}
+
+def _normalize_rain_events(events):
+    """Map the parsed rain labels onto RAIN_EVENT_DTYPE, working on the categories instead of every row."""
+    lookup = np.array(
+        [_RAIN_EVENT_CODES.get(str(c).replace(" ", "").lower(), -1) for c in events.cat.categories] + [-1],
+        dtype=np.int8
+    )
+    # Missing values have code -1, which picks the trailing -1 of the lookup table.
+    return pd.Categorical.from_codes(lookup[events.cat.codes.to_numpy()], dtype=RAIN_EVENT_DTYPE)
+
+def _parse_csv(data, names):
+    """Parse headerless CSV bytes, with UTC timestamps and numeric sensor columns."""
+    # The C engine is used on purpose: the pyarrow engine rejects the short rows
+    # appended by the single-sensor scripts (e.g. wind.py writes 13 of 16 columns).
+    df = pd.read_csv(
+        io.BytesIO(data),
+        engine="c",
+        header=None,
+        names=names,
+        dtype={"Rain Event (LM393)": "category"},
+        low_memory=False
+    )
+    # Selecting after parsing rather than with usecols: pandas rejects usecols together
+    # with names when every row of an appended chunk is shorter than the header.
+    df = df.drop(columns=[col for col in df.columns if col not in NOTIFICATION_COLS])
+    # Parse with the fixed format and mark as UTC in one pass; a malformed line becomes NaT
+    # (and is dropped by the 24-hour filter) instead of failing the whole chunk.
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y-%m-%d %H:%M:%S", errors="coerce", utc=True)
+    if "Rain Event (LM393)" in df.columns:
+        df["Rain Event (LM393)"] = _normalize_rain_events(df["Rain Event (LM393)"])
+    # The C parser already yields float columns for clean sensor data; only a column that
+    # picked up stray text (e.g. a repeated header line) needs the slower coercion.
+    for col in df.columns:
+        if col not in NON_NUMERIC_COLS and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+def _tail_offset(f, since):
+    """
+    Return the offset of a line written before `since`, stepping back from the end of
+    the file in blocks so that only the recent tail has to be parsed on start-up.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    while pos > 0:
+        pos = max(0, pos - TAIL_BLOCK_SIZE)
+        f.seek(pos)
+        if pos > 0:
+            f.readline()  # Skip the partial line we landed in
+        line_start = f.tell()
+        try:
+            ts = datetime.strptime(f.readline()[:19].decode("utf-8"), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+        if ts.replace(tzinfo=ZoneInfo("UTC")) < since:
+            return line_start
+    return 0
+
+def _update_daily_stats(new_df):
+    """Fold the MCP9808 readings of newly parsed rows into today's running minimum and maximum."""
+    midnight_utc = datetime.now(ZoneInfo("UTC")).replace(hour=0, minute=0, second=0, microsecond=0)
+    if _daily_stats["date"] != midnight_utc.date():
+        _daily_stats.update(date=midnight_utc.date(), min=np.inf, max=-np.inf)
+    col = "Temperature (MCP9808) (°C)"
+    if col not in new_df.columns:
+        return
+    temps = new_df.loc[new_df["timestamp"] >= midnight_utc, col].to_numpy(dtype=np.float32, copy=False)
+    temps = temps[~np.isnan(temps)]
+    if temps.size:
+        _daily_stats["min"] = min(_daily_stats["min"], temps.min())
+        _daily_stats["max"] = max(_daily_stats["max"], temps.max())
 
-def load_data():
-    """For event-based checks: load the last 24 hours of data."""
+def _load_incremental():
+    """
+    Return the last 24 hours of data. Only the bytes appended to the CSV since the
+    previous call are parsed; earlier rows are kept in the module-level cache.
+    """
     try:
-        df = pd.read_csv(
-            CSV_PATH,
-            parse_dates=["timestamp"],
-            date_format="%Y-%m-%d %H:%M:%S",
-            low_memory=False
-        )
-        df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
-        now_utc = datetime.now(ZoneInfo("UTC"))
-        threshold = now_utc - timedelta(hours=24)
+        threshold = datetime.now(ZoneInfo("UTC")) - CACHE_WINDOW
+        with open(CSV_PATH, "rb") as f:
+            if f.seek(0, os.SEEK_END) < _cache["offset"]:
+                # The file was truncated or replaced, start over.
+                _cache.update(df=None, names=None, offset=0)
+                _daily_stats.update(date=None, min=np.inf, max=-np.inf)
+            if _cache["names"] is None:
+                f.seek(0)
+                header = f.readline()
+                if not header.endswith(b"\n"):
+                    return pd.DataFrame()
+                _cache["names"] = header.decode("utf-8").strip().split(",")
+                _cache["offset"] = max(len(header), _tail_offset(f, threshold))
+            f.seek(_cache["offset"])
+            new_bytes = f.read()
+
+        # Only consume complete lines, a sensor script may be halfway through writing one.
+        end = new_bytes.rfind(b"\n") + 1
+        if end == 0:
+            return _cache["df"] if _cache["df"] is not None else pd.DataFrame()
+
+        new_df = _parse_csv(new_bytes[:end], _cache["names"])
+        _update_daily_stats(new_df)
+        cached = _cache["df"]
+        df = new_df if cached is None else pd.concat([cached, new_df], ignore_index=True)
+        _cache["offset"] += end
+
         df = df[df["timestamp"] >= threshold]
-        numeric_cols = [col for col in df.columns if col not in ["timestamp", "Lightning Detection (AS3935)", "Rain Event (LM393)"]]
-        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+        # The CSV is append-only, so rows are normally already in time order. Several
+        # scripts write to it (listen.py in buffered batches), so re-sort only if needed.
+        if not df["timestamp"].is_monotonic_increasing:
+            df = df.sort_values("timestamp", kind="stable")
+        df = df.reset_index(drop=True)
+        _cache["df"] = df
         return df
     except Exception as e:
         print("Error loading data:", e)
@@ -62,72 +174,63 @@ def load_data():
 # Notification Functions
 # ------------------------------
 
-def check_min_temp_notification(today_date):
+def _daily_stat_value(daily_stats, key, now_utc):
+    """Return today's cached MCP9808 minimum/maximum, or None if nothing was recorded since midnight UTC."""
+    if daily_stats["date"] != now_utc.date() or not np.isfinite(daily_stats[key]):
+        return None
+    return daily_stats[key]
+
+def check_min_temp_notification(daily_stats, now_utc):
     """
     If current UTC time is between 07:00 and 07:05 and no minimum notification has been sent today,
     return the minimum temperature notification message (using the MCP9808 sensor).
     """
-    now_utc = datetime.utcnow().replace(tzinfo=ZoneInfo("UTC"))
-    if now_utc.hour == 7 and now_utc.minute < 5:
-        df = load_all_data()
-        midnight_utc = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-        df_today = df[df["timestamp"] >= midnight_utc]
-        if df_today.empty or "Temperature (MCP9808) (°C)" not in df_today.columns:
-            return None
-        min_temp = df_today["Temperature (MCP9808) (°C)"].min()
-        if np.isnan(min_temp):
+    if now_utc.hour == MIN_TEMP_HOUR and now_utc.minute < 5:
+        min_temp = _daily_stat_value(daily_stats, "min", now_utc)
+        if min_temp is None:
             return None
         return f"Daily Minimum (MCP9808): {min_temp:.1f}°C recorded since midnight UTC."
     return None
 
-def check_max_temp_notification(today_date):
+def check_max_temp_notification(daily_stats, now_utc):
     """
     If current UTC time is between 15:00 and 15:05 and no maximum notification has been sent today,
     return the maximum temperature notification message (using the MCP9808 sensor).
     """
-    now_utc = datetime.utcnow().replace(tzinfo=ZoneInfo("UTC"))
-    if now_utc.hour == 15 and now_utc.minute < 5:
-        df = load_all_data()
-        midnight_utc = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-        df_today = df[df["timestamp"] >= midnight_utc]
-        if df_today.empty or "Temperature (MCP9808) (°C)" not in df_today.columns:
-            return None
-        max_temp = df_today["Temperature (MCP9808) (°C)"].max()
-        if np.isnan(max_temp):
+    if now_utc.hour == MAX_TEMP_HOUR and now_utc.minute < 5:
+        max_temp = _daily_stat_value(daily_stats, "max", now_utc)
+        if max_temp is None:
             return None
         return f"Daily Maximum (MCP9808): {max_temp:.1f}°C recorded since midnight UTC."
     return None
 
-def check_rain_notification():
-    df = load_data().sort_values("timestamp")
+def check_rain_notification(df):
+    if df.empty:
+        return None
     col = "Rain Event (LM393)"
     if col not in df.columns:
         return None
 
-    # Keep only non-null, non-blank event rows
-    events = (
-        df[col]
-        .dropna()                   # remove NaNs
-        .astype(str)                # ensure string type
-        .str.strip()                # trim whitespace
-        .reset_index(drop=True)
-    )
-    if len(events) < 2:
+    # Category codes of the event rows only (-1 marks rows without a rain reading)
+    codes = df[col].cat.codes.to_numpy()
+    event_rows = np.flatnonzero(codes >= 0)
+    if len(event_rows) < 2:
         return None
 
-    prev_event, last_event = events.iloc[-2], events.iloc[-1]
-    if last_event.lower() == "rain" and prev_event.lower() == "no rain":
+    prev_event, last_event = codes[event_rows[-2]], codes[event_rows[-1]]
+    if last_event == RAIN_CODE and prev_event == NO_RAIN_CODE:
         # get timestamp of that last event row
-        ts = df[df[col].notna()].iloc[-1]["timestamp"]
+        ts = df["timestamp"].iloc[event_rows[-1]]
         event_time = ts.astimezone(ZoneInfo("Europe/Athens")).strftime("%H:%M")
         return f"Rain detected at {event_time} (rain started)."
     return None
 
 _last_lightning_time = None  # module-level
 
-def check_lightning_notification():
+def check_lightning_notification(df):
     global _last_lightning_time
-    df = load_data().sort_values("timestamp")
+    if df.empty:
+        return None
     col = "Lightning Distance (AS3935) (km)"
     if col not in df.columns:
         return None
@@ -155,7 +258,39 @@ async def send_notification(message):
     await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
 
 # ------------------------------
-# Main async loop to continuously check and send notifications
+# Wake-up sources for the main loop
+# ------------------------------
+async def watch_csv(changed):
+    """Set `changed` every time a sensor script appends to the CSV (inotify IN_MODIFY)."""
+    while True:
+        try:
+            with Inotify() as inotify:
+                inotify.add_watch(CSV_PATH, Mask.MODIFY | Mask.MOVE_SELF | Mask.DELETE_SELF)
+                changed.set()
+                async for event in inotify:
+                    changed.set()
+                    if event.mask & (Mask.MOVE_SELF | Mask.DELETE_SELF):
+                        break  # The CSV was replaced, watch the new file
+        except OSError as e:
+            print(f"Could not watch {CSV_PATH}: {e}. Checking every {POLL_INTERVAL} seconds.")
+            changed.set()
+        await asyncio.sleep(POLL_INTERVAL)
+
+async def wake_at_daily_times(changed):
+    """Set `changed` at the daily min/max notification times, even if no new data arrives."""
+    while True:
+        now_utc = datetime.now(ZoneInfo("UTC"))
+        next_runs = []
+        for hour in (MIN_TEMP_HOUR, MAX_TEMP_HOUR):
+            run = now_utc.replace(hour=hour, minute=0, second=0, microsecond=0)
+            if run <= now_utc:
+                run += timedelta(days=1)
+            next_runs.append(run)
+        await asyncio.sleep((min(next_runs) - now_utc).total_seconds())
+        changed.set()
+
+# ------------------------------
+# Main async loop to check and send notifications whenever new data arrives
 # ------------------------------
 async def main_loop():
     # Track the date when the daily min and max notifications were sent.
@@ -166,32 +301,46 @@ async def main_loop():
     previous_rain_notification = None
     previous_lightning_notification = None
 
+    # Instead of polling, the loop sleeps until the CSV changes or a daily notification is due.
+    changed = asyncio.Event()
+    # Keep references to the tasks so they are not garbage collected while running.
+    wake_tasks = [
+        asyncio.create_task(watch_csv(changed)),
+        asyncio.create_task(wake_at_daily_times(changed))
+    ]
+
     while True:
+        await changed.wait()
+        changed.clear()
+
         notifications = []
         
         now_utc = datetime.utcnow().replace(tzinfo=ZoneInfo("UTC"))
         today_date = now_utc.date()
 
+        # Read the CSV once per tick and run every check on the same snapshot.
+        df = _load_incremental()
+
         # 1) Daily minimum temperature notification at 07:00 UTC
-        min_msg = check_min_temp_notification(today_date)
+        min_msg = check_min_temp_notification(_daily_stats, now_utc)
         if min_msg and (sent_min_date != today_date):
             notifications.append(min_msg)
             sent_min_date = today_date  # mark today's min as sent
 
         # 2) Daily maximum temperature notification at 15:00 UTC
-        max_msg = check_max_temp_notification(today_date)
+        max_msg = check_max_temp_notification(_daily_stats, now_utc)
         if max_msg and (sent_max_date != today_date):
             notifications.append(max_msg)
             sent_max_date = today_date  # mark today's max as sent
 
         # 3) Event-based: Rain notification when it changes from "No Rain" to "Rain"
-        rain_msg = check_rain_notification()
+        rain_msg = check_rain_notification(df)
         if rain_msg and rain_msg != previous_rain_notification:
             notifications.append(rain_msg)
             previous_rain_notification = rain_msg
 
         # 4) Event-based: Lightning notification with distance
-        lightning_msg = check_lightning_notification()
+        lightning_msg = check_lightning_notification(df)
         if lightning_msg and lightning_msg != previous_lightning_notification:
             notifications.append(lightning_msg)
             previous_lightning_notification = lightning_msg
@@ -201,8 +350,5 @@ async def main_loop():
             await send_notification(msg)
             print("Notification sent:", msg)
 
-        # Sleep for 19 seconds before checking again.
-        await asyncio.sleep(19)
-
 if __name__ == "__main__":
     asyncio.run(main_loop())
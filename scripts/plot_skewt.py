@@ -1,76 +1,293 @@
+import matplotlib
+# Render off-screen: the script runs headless on the Pi and only saves PNGs
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+import json
 import os
+import pickle
+import time
+import warnings
 
+import metpy
 import metpy.calc as mpcalc
 from metpy.cbook import get_test_data
 from metpy.plots import SkewT
 from metpy.units import units
-from metpy.interpolate import interpolate_1d
+from requests.adapters import HTTPAdapter
+from siphon.http_util import session_manager
 from siphon.simplewebservice.wyoming import WyomingUpperAir
+from urllib3.util.retry import Retry
 
+from _indices_numba import k_index_from_profile, lifted_index_from_profile
 
-def plot_skewt_for_station(station_id, station_name_long, save_dir):
+# Soundings already downloaded from weather.uwyo.edu are kept on disk, so re-running
+# the script for the same station and time does not hit the network again.
+CACHE_DIR = '/home/dimitris/weather_station/upper_air_cache'
+CACHE_MAX_AGE_DAYS = 7
+
+# Pressure levels (hPa) at which wind barbs are drawn, evenly spaced in log-p
+BARB_LEVELS = np.logspace(np.log10(1000), np.log10(100), 40)
+
+# The empty Skew-T background (adiabats and mixing lines) is the same for every
+# sounding, so it is pickled once. The file name includes the library versions
+# because pickled figures are not portable between matplotlib/MetPy releases.
+SKEWT_BASE_FILE = os.path.join(
+    CACHE_DIR, f'skewt_base_mpl{matplotlib.__version__}_metpy{metpy.__version__}.pkl')
+
+try:
+    import pyarrow  # noqa: F401  (only needed for the parquet cache)
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pkl'
+
+
+def _make_wyoming_session():
+    """Creates the pooled, retrying requests session shared by all Wyoming requests."""
+    session = session_manager.create_session()  # Keeps siphon's user agent
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class _SessionWyoming(WyomingUpperAir):
+    """
+    WyomingUpperAir creates a new endpoint, and with it a new HTTP session, for
+    every request_data call. This subclass swaps in one session shared by all
+    requests, so the 06Z/00Z retries and multi-station fetches reuse connections.
+    """
+    _shared_session = _make_wyoming_session()
+
+    def __init__(self):
+        super().__init__()
+        self._session = self._shared_session
+
+
+def _prune_cache():
+    """Delete cached soundings older than CACHE_MAX_AGE_DAYS."""
+    cutoff = time.time() - CACHE_MAX_AGE_DAYS * 86400
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _cached_request(station_id, dt):
+    """
+    Returns the Wyoming sounding for station_id at dt, downloading it only if it
+    is not already in CACHE_DIR. The units dictionary and attrs that siphon puts
+    on the dataframe are stored in a sidecar JSON file, since neither parquet nor
+    pickle keep plain attributes. The cache is best-effort: if it cannot be read
+    or written, the sounding is simply downloaded.
+    """
+    base = os.path.join(CACHE_DIR, f"{station_id}_{dt:%Y%m%d%H}")
+    path = f"{base}.{CACHE_FORMAT}"
+    meta_path = f"{base}.json"
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _prune_cache()
+        if os.path.exists(path) and os.path.exists(meta_path):
+            if CACHE_FORMAT == 'parquet':
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_pickle(path)
+            with open(meta_path) as f:
+                meta = json.load(f)
+            df.attrs.update(meta['attrs'])
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', "Pandas doesn't allow columns to be created",
+                                        UserWarning)
+                df.units = meta['units']
+            print(f"Using cached sounding {path}")
+            return df
+    except Exception as e:
+        print(f"Could not read the sounding cache, downloading instead: {e}")
+
+    df = _SessionWyoming.request_data(time=dt, site_id=station_id)
+    try:
+        if CACHE_FORMAT == 'parquet':
+            df.to_parquet(path)
+        else:
+            df.to_pickle(path)
+        with open(meta_path, 'w') as f:
+            json.dump({'units': getattr(df, 'units', {}), 'attrs': df.attrs}, f, default=str)
+    except Exception as e:
+        print(f"Could not cache the sounding: {e}")
+    return df
+
+
+def _skewt_base():
+    """
+    Returns a new SkewT (on a new pyplot figure) with the dry adiabats, moist
+    adiabats and mixing lines already drawn, loading it from SKEWT_BASE_FILE
+    when possible instead of recomputing the curves.
+    """
+    try:
+        with open(SKEWT_BASE_FILE, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # Missing or unreadable file: build the background and save it for next time
+        pass
+
+    fig = plt.figure(figsize=(12, 12))
+    skew = SkewT(fig, rotation=45)
+    skew.plot_dry_adiabats(alpha=0.25)
+    skew.plot_moist_adiabats(alpha=0.25)
+    skew.plot_mixing_lines(alpha=0.25)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(SKEWT_BASE_FILE, 'wb') as f:
+            pickle.dump(skew, f)
+    except Exception as e:
+        print(f"Could not cache the Skew-T background: {e}")
+    return skew
+
+
+def _format_index(name, unit, label, calc):
+    """
+    Returns the text-box line for one instability index, e.g. 'K Index: 23.88 °C'.
+    calc() may return a pint quantity (converted to `unit`) or a plain float;
+    'N/A' is shown if it fails or the sounding does not cover the needed levels.
+    """
+    try:
+        value = calc()
+        if hasattr(value, 'to'):
+            value = value.to(unit).magnitude
+        if not np.isfinite(value):
+            raise ValueError("required levels are missing from the sounding")
+        return f'{name}: {value:.2f} {label}'
+    except Exception as e:
+        print(f"Could not calculate {name}. Error: {e}")
+        return f'{name}: N/A'
+
+
+def _parcel_paths(p, p_T, Td_T, sfc_temperature, sfc_dewpoint):
+    """
+    Lifts the parcel once over the levels with a temperature, starting at p[0] (the
+    lowest level that also has a dewpoint), so the path reaches as high as the
+    temperature data does for the Lifted Index.
+
+    Args:
+        p (pint.Quantity): Pressure of the levels with T and Td.
+        p_T, Td_T (np.ndarray): Pressure (hPa) and dewpoint (degC, may be NaN) of the
+            levels with T.
+
+    Returns:
+        (parcel_prof, li_levels, parcel_prof_full): the parcel path at the levels of p
+        in degC, the mask of p_T for the full path, and the full path, or None if it
+        could not be calculated (the Lifted Index is then N/A).
+    """
+    # Temperatures reported below p[0] (where the surface Td is missing) are skipped,
+    # otherwise the parcel would be lifted from the wrong level
+    li_levels = p_T <= p[0].m_as('hPa')
+    parcel_prof = parcel_prof_full = None
+    try:
+        parcel_prof_full = mpcalc.parcel_profile(p_T[li_levels] * units.hPa,
+                                                 sfc_temperature, sfc_dewpoint)
+    except Exception as e:
+        print(f"Could not calculate the full-column parcel profile. Error: {e}")
+    else:
+        # The levels of the full path that also have a dewpoint are the levels in p
+        on_p = ~np.isnan(Td_T[li_levels])
+        if on_p.sum() == len(p):
+            parcel_prof = parcel_prof_full[on_p].to('degC')
+    if parcel_prof is None:
+        parcel_prof = mpcalc.parcel_profile(p, sfc_temperature, sfc_dewpoint).to('degC')
+    return parcel_prof, li_levels, parcel_prof_full
+
+
+def fetch_sounding(station_id):
     """
     Fetches the latest upper-air data for a given station ID, prioritizing 06Z
-    and falling back to 00Z. It then calculates thermodynamic properties
-    and instability indices, and plots a Skew-T diagram with an information box.
+    and falling back to 00Z.
+
+    Args:
+        station_id (str): The WMO station identifier (e.g., '16622' for LGTS).
+
+    Returns:
+        tuple: (DataFrame, datetime) of the fetched sounding, or (None, None)
+        if no data is available for either time.
+    """
+    # ### MODIFICATION START ###
+    # --- 1. & 2. Set Time and Request Data (with fallback logic) ---
+    now_utc = datetime.now(timezone.utc)
+    # Define the hours to try in order of preference
+    hours_to_try = [6, 0]
+
+    for hour in hours_to_try:
+        try:
+            # Set the target datetime for the current attempt
+            dt = now_utc.replace(hour=hour, minute=0, second=0, microsecond=0)
+            print(f"Attempting to fetch data for station {station_id} for {dt:%Y-%m-%d %H:%M}Z...")
+
+            # Request data for the specified time (served from disk if cached)
+            df = _cached_request(station_id, dt)
+
+            # If the request succeeds, we have our data.
+            print(f"Data fetched successfully for {station_id} at {dt:%Y-%m-%d %H:%M}Z.")
+            return df, dt
+
+        except Exception:
+            # If it fails, print a message. The loop will try the next hour.
+            print(f"-> No data available for {station_id} at {hour:02d}Z. Trying next available time.")
+
+    # If the loop finished, no data was found for any time.
+    print(f"Could not retrieve data for {station_id} for 06Z or 00Z. No plot will be generated.")
+    return None, None
+    # ### MODIFICATION END ###
+
+
+def plot_skewt_for_station(station_id, station_name_long, save_dir, sounding=None):
+    """
+    Calculates thermodynamic properties and instability indices for the latest
+    sounding of a station, and plots a Skew-T diagram with an information box.
 
     Args:
         station_id (str): The WMO station identifier (e.g., '16622' for LGTS).
         station_name_long (str): The full name for the plot title.
         save_dir (str): The directory where the plot will be saved.
+        sounding (tuple, optional): (DataFrame, datetime) from fetch_sounding.
+            Fetched here when not given.
     """
-    try:
-        # ### MODIFICATION START ###
-        # --- 1. & 2. Set Time and Request Data (with fallback logic) ---
-        now_utc = datetime.now(timezone.utc)
-        # Define the hours to try in order of preference
-        hours_to_try = [6, 0] 
-        df = None # Initialize dataframe to None
-        
-        for hour in hours_to_try:
-            try:
-                # Set the target datetime for the current attempt
-                dt = now_utc.replace(hour=hour, minute=0, second=0, microsecond=0)
-                print(f"Attempting to fetch data for station {station_id} for {dt:%Y-%m-%d %H:%M}Z...")
-
-                # Request data for the specified time
-                df = WyomingUpperAir().request_data(time=dt, site_id=station_id)
-                
-                # If the request succeeds, we have our data.
-                print(f"Data fetched successfully for {dt:%Y-%m-%d %H:%M}Z.")
-                break # Exit the loop since we found data
-                
-            except Exception:
-                # If it fails, print a message. The loop will try the next hour.
-                print(f"-> No data available for {hour:02d}Z. Trying next available time.")
-        
-        # If the loop finished and df is still None, no data was found for any time.
-        if df is None:
-            print("Could not retrieve data for 06Z or 00Z. No plot will be generated.")
-            return # Exit the function cleanly
-        # ### MODIFICATION END ###
+    if sounding is None:
+        sounding = fetch_sounding(station_id)
+    df, dt = sounding
+    if df is None:
+        return # Nothing to plot
 
+    try:
         # --- 3. Prepare Data for MetPy ---
-        # Extract the necessary columns and assign units.
-        p = df['pressure'].values * units.hPa
-        T = df['temperature'].values * units.degC
-        Td = df['dewpoint'].values * units.degC
-        u = df['u_wind'].values * units.knots
-        v = df['v_wind'].values * units.knots
-        height = df['height'].values * units.meter
-        
-        # Drop rows with missing pressure, temperature, or dewpoint data
-        valid_mask = ~np.isnan(p.magnitude) & ~np.isnan(T.magnitude) & ~np.isnan(Td.magnitude)
-        p = p[valid_mask]
-        T = T[valid_mask]
-        Td = Td[valid_mask]
-        u = u[valid_mask]
-        v = v[valid_mask]
-        height = height[valid_mask] # Apply mask to height as well
+        # Convert the needed columns once into a dense float64 block with one contiguous
+        # row per field (Wyoming columns may come back as object dtype). Everything below,
+        # including the index calculations, works on views of this block instead of
+        # going back to the dataframe.
+        cols = ('pressure', 'temperature', 'dewpoint', 'u_wind', 'v_wind', 'height')
+        profile = np.empty((len(cols), len(df)), dtype=np.float64)
+        for row, col in zip(profile, cols):
+            row[:] = df[col].to_numpy(dtype=np.float64)
+        assert profile[0].flags.c_contiguous
+
+        # Drop rows with missing pressure, temperature, or dewpoint data. The block is
+        # already stacked, so one isnan pass plus an any() reduction covers all three.
+        valid_mask = ~np.isnan(profile[:3]).any(axis=0)
+        arr = profile[:, valid_mask]
+
+        # Assign units to the masked columns
+        p = arr[0] * units.hPa
+        T = arr[1] * units.degC
+        Td = arr[2] * units.degC
+        u = arr[3] * units.knots
+        v = arr[4] * units.knots
+        height = arr[5] * units.meter
 
         # Get the time from the dataframe's attributes for the title
         # The 'dt' from the successful fetch is used as the valid time
@@ -91,150 +308,80 @@ def plot_skewt_for_station(station_id, station_name_long, save_dir):
             sfc_dewpoint = Td[0]
             print("Fewer than 3 points available; using surface-based parcel.")
 
-        # Calculate the parcel profile for plotting and CAPE/CIN calculations.
-        parcel_prof = mpcalc.parcel_profile(p, sfc_temperature, sfc_dewpoint).to('degC')
+        # The Lifted Index and K-Index use all available temperature data, ignoring
+        # gaps in the dewpoint data, since T is often reported higher up than Td.
+        # Build those full-column profiles once and share them between both blocks.
+        p_full, T_full, Td_full = profile[:3]
+        valid_T_mask = ~np.isnan(profile[:2]).any(axis=0)
+        # The index arithmetic works on plain arrays in hPa and degC; units are only
+        # attached where a MetPy thermodynamic function needs them.
+        # Data for Temperature interpolation (only requires valid P and T). Td keeps
+        # its NaNs here; the index kernels skip them when interpolating dewpoint.
+        p_for_T_interp = p_full[valid_T_mask]
+        T_for_T_interp = T_full[valid_T_mask]
+        Td_for_T_interp = Td_full[valid_T_mask]
+
+        # Calculate the parcel profile once over the full temperature column (from p[0]
+        # up), for plotting, CAPE/CIN, LFC and EL and for the Lifted Index.
+        parcel_prof, li_levels, parcel_prof_full = _parcel_paths(
+            p, p_for_T_interp, Td_for_T_interp, sfc_temperature, sfc_dewpoint)
 
         # Calculate CAPE and CIN
         cape, cin = mpcalc.cape_cin(p, T, Td, parcel_prof)
         print(f"Calculated CAPE: {cape:.2f}")
         print(f"Calculated CIN: {cin:.2f}")
         
-        # Calculate LCL, LFC, and EL
+        # Calculate LCL, LFC, and EL. The precomputed parcel path is passed in so
+        # lfc/el do not integrate their own moist adiabat.
         lcl_pressure, lcl_temperature = mpcalc.lcl(sfc_pressure, sfc_temperature, sfc_dewpoint)
-        p_for_lfc, T_for_lfc, Td_for_lfc = p, T.copy(), Td.copy()
-        T_for_lfc[0], Td_for_lfc[0] = sfc_temperature, sfc_dewpoint
-        lfc_pressure, lfc_temperature = mpcalc.lfc(p_for_lfc, T_for_lfc, Td_for_lfc, which='most_cape')
-        el_pressure, el_temperature = mpcalc.el(p_for_lfc, T_for_lfc, Td_for_lfc, which='most_cape')
+        # lfc/el still need the parcel's starting values as the first environment level
+        # (el takes its LCL from it). Copy the T and Td rows of the profile block in one
+        # allocation and set the first level on the raw degC values.
+        lfc_rows = arr[1:3].copy()
+        lfc_rows[:, 0] = sfc_temperature.m_as('degC'), sfc_dewpoint.m_as('degC')
+        p_for_lfc, T_for_lfc, Td_for_lfc = p, lfc_rows[0] * units.degC, lfc_rows[1] * units.degC
+        lfc_pressure, lfc_temperature = mpcalc.lfc(p_for_lfc, T_for_lfc, Td_for_lfc,
+                                                   parcel_temperature_profile=parcel_prof,
+                                                   dewpoint_start=sfc_dewpoint, which='most_cape')
+        el_pressure, el_temperature = mpcalc.el(p_for_lfc, T_for_lfc, Td_for_lfc,
+                                                parcel_temperature_profile=parcel_prof, which='most_cape')
 
         # --- 4a. Calculate Additional Instability Indices ---
         print("Calculating instability indices...")
-        indices = {}
-        
-        # ### MODIFICATION START: LIFTED-INDEX CALCULATION ###
-        # Lifted Index
-        try:
-            # Use the same robust data preparation as the K-Index to ensure we use
-            # all available temperature data, ignoring any gaps in dewpoint data.
-            p_full = df['pressure'].values * units.hPa
-            T_full = df['temperature'].values * units.degC
-            valid_T_mask = ~np.isnan(p_full.magnitude) & ~np.isnan(T_full.magnitude)
-            p_for_interp = p_full[valid_T_mask]
-            T_for_interp = T_full[valid_T_mask]
-
-            # Recalculate the parcel profile using the full pressure column for temperature.
-            # This ensures the parcel path extends as high as the temperature data does.
-            parcel_prof_full = mpcalc.parcel_profile(p_for_interp, sfc_temperature, sfc_dewpoint)
-
-            # Define target pressure
-            p_500 = 500 * units.hPa
-
-            # Interpolate environmental temperature at 500 hPa from the full T profile.
-            # We add [0] to extract the single value from the array returned by interpolate_1d.
-            t_500 = interpolate_1d(p_500, p_for_interp, T_for_interp)[0]
-
-            # Interpolate parcel temperature at 500 hPa from the full parcel profile.
-            parcel_t_500 = interpolate_1d(p_500, p_for_interp, parcel_prof_full)[0]
-
-            # Calculate Lifted Index. The units library correctly handles degC - degC = delta_degC.
-            li_val = t_500 - parcel_t_500
-
-            indices['Lifted Index'] = f'Lifted Index: {li_val.to("delta_degC").magnitude:.2f} °C'
-            print("Lifted Index calculated successfully.")
-
-        except Exception as e:
-            indices['Lifted Index'] = 'Lifted Index: N/A'
-            print(f"Could not calculate Lifted Index. Error: {e}")
-        # ### MODIFICATION END ###
-
-        # Showalter Index
-        try:
-            si_val = mpcalc.showalter_index(p, T, Td)
-            indices['Showalter Index'] = f'Showalter Index: {si_val[0].to("delta_degC").magnitude:.2f} °C'
-        except Exception:
-            indices['Showalter Index'] = 'Showalter Index: N/A'
-
-        # ### MODIFICATION START: K-INDEX CALCULATION ###
-        # K Index - Interpolate to required levels to avoid 'N/A'
-        try:
-            # We need T at 850, 700, 500 hPa and Td at 850, 700 hPa.
-            # T data is often available higher up than Td data. We will handle them
-            # separately to ensure we use all available data.
-
-            # Prepare data for Temperature interpolation (only requires valid P and T)
-            p_full = df['pressure'].values * units.hPa
-            T_full = df['temperature'].values * units.degC
-            valid_T_mask = ~np.isnan(p_full.magnitude) & ~np.isnan(T_full.magnitude)
-            p_for_T_interp = p_full[valid_T_mask]
-            T_for_T_interp = T_full[valid_T_mask]
-
-            # Prepare data for Dewpoint interpolation (requires valid P, T, and Td)
-            Td_full = df['dewpoint'].values * units.degC
-            valid_Td_mask = ~np.isnan(p_full.magnitude) & ~np.isnan(T_full.magnitude) & ~np.isnan(Td_full.magnitude)
-            p_for_Td_interp = p_full[valid_Td_mask]
-            Td_for_Td_interp = Td_full[valid_Td_mask]
-
-            # Interpolate temperatures.
-            p_req_T = np.array([850, 700, 500]) * units.hPa
-            T_req = interpolate_1d(p_req_T, p_for_T_interp, T_for_T_interp)
-            T850, T700, T500 = T_req[0], T_req[1], T_req[2]
-
-            # Interpolate dewpoints.
-            p_req_Td = np.array([850, 700]) * units.hPa
-            Td_req = interpolate_1d(p_req_Td, p_for_Td_interp, Td_for_Td_interp)
-            Td850, Td700 = Td_req[0], Td_req[1]
-
-            # **FIX for units**: Extract magnitudes for calculation to avoid unit conflicts.
-            t850_m = T850.magnitude
-            t500_m = T500.magnitude
-            td850_m = Td850.magnitude
-            t700_m = T700.magnitude
-            td700_m = Td700.magnitude
-
-            # Perform calculation on raw numbers
-            k_val_mag = (t850_m - t500_m) + td850_m - (t700_m - td700_m)
-
-            # Re-attach the final, correct unit for an index
-            k_val = k_val_mag * units.delta_degC
-
-            indices['K Index'] = f'K Index: {k_val.to("delta_degC").magnitude:.2f} °C'
-            print("K-Index calculated successfully.")
-
-        except Exception as e:
-            # This block will now only be entered if data is truly missing within the required layers.
-            indices['K Index'] = 'K Index: N/A'
-            print(f"Could not calculate K-Index, likely due to missing data within the 850-700 hPa layer. Error: {e}")
-        # ### MODIFICATION END ###
-            
-        # Total Totals Index
-        try:
-            tt_val = mpcalc.total_totals_index(p, T, Td)
-            indices['Total Totals'] = f'Total Totals: {tt_val.to("delta_degC").magnitude:.2f} °C'
-        except Exception:
-            indices['Total Totals'] = 'Total Totals: N/A'
-
-        # Precipitable Water (mm)
-        try:
-            pwat_val = mpcalc.precipitable_water(p, Td)
-            indices['Precipitable Water'] = f'Precipitable Water: {pwat_val.to("mm").magnitude:.2f} mm'
-        except Exception:
-            indices['Precipitable Water'] = 'Precipitable Water: N/A'
-
-        # 0-6 km Bulk Shear
-        try:
-            shear_u, shear_v = mpcalc.bulk_shear(p, u, v, height=height, depth=6000 * units.meter)
-            shear_mag = mpcalc.wind_speed(shear_u, shear_v)
-            indices['0-6km Bulk Shear'] = f'0-6km Bulk Shear: {shear_mag.to("knots").magnitude:.2f} kts'
-        except Exception:
-            indices['0-6km Bulk Shear'] = '0-6km Bulk Shear: N/A'
+        # The Lifted Index lifts along the full path from p[0]; N/A if that failed
+        def lifted_index():
+            if parcel_prof_full is None:
+                raise ValueError("no parcel path over the temperature column")
+            return lifted_index_from_profile(p_for_T_interp[li_levels], T_for_T_interp[li_levels],
+                                             parcel_prof_full.m_as('degC'))
+
+        # (name, unit, label, calculation) for each index in the text box. The Lifted
+        # Index and K-Index use the compiled kernels on the full T column (raw degC), so
+        # they reach as high as the temperature data does even where Td is missing.
+        index_specs = [
+            ('Lifted Index', 'delta_degC', '°C', lifted_index),
+            ('Showalter Index', 'delta_degC', '°C', lambda: mpcalc.showalter_index(p, T, Td)[0]),
+            ('K Index', 'delta_degC', '°C',
+             lambda: k_index_from_profile(p_for_T_interp, T_for_T_interp, Td_for_T_interp)),
+            ('Total Totals', 'delta_degC', '°C', lambda: mpcalc.total_totals_index(p, T, Td)),
+            ('Precipitable Water', 'mm', 'mm', lambda: mpcalc.precipitable_water(p, Td)),
+            ('0-6km Bulk Shear', 'knots', 'kts',
+             lambda: mpcalc.wind_speed(*mpcalc.bulk_shear(p, u, v, height=height,
+                                                          depth=6000 * units.meter))),
+        ]
+        index_lines = [_format_index(*spec) for spec in index_specs]
 
         # --- 5. Create the Skew-T Plot ---
         print("Generating Skew-T plot...")
-        fig = plt.figure(figsize=(12, 12)) 
-        skew = SkewT(fig, rotation=45)
+        # The background curves come pre-drawn from the cached base figure.
+        skew = _skewt_base()
 
         skew.plot(p, T, 'r', linewidth=2, label='Temperature')
         skew.plot(p, Td, 'g', linewidth=2, label='Dewpoint')
-        skew.plot_barbs(p[::5], u[::5], v[::5], y_clip_radius=0.03)
+        # Plot barbs at the observed levels nearest to an even log-pressure grid, so
+        # they are not crowded near the surface and sparse aloft like a fixed stride.
+        barb_idx = mpcalc.resample_nn_1d(p.magnitude, BARB_LEVELS)
+        skew.plot_barbs(p[barb_idx], u[barb_idx], v[barb_idx], y_clip_radius=0.03)
         skew.plot(p, parcel_prof, 'k', linewidth=2, linestyle='--', label='Parcel Path')
 
         skew.shade_cin(p, T, parcel_prof, Td, alpha=0.2, color='blue')
@@ -247,32 +394,22 @@ def plot_skewt_for_station(station_id, station_name_long, save_dir):
         if np.isfinite(el_pressure):
              skew.plot(el_pressure, el_temperature, 'ro', markerfacecolor='red', label='EL')
 
-        skew.plot_dry_adiabats(alpha=0.25)
-        skew.plot_moist_adiabats(alpha=0.25)
-        skew.plot_mixing_lines(alpha=0.25)
-
         # --- 6. Finalize the Plot ---
         skew.ax.set_ylim(1050, 100)
         skew.ax.set_xlim(-40, 40)
         
-        plt.title(f'Skew-T Log-P for {station_name_long}', loc='left')
-        plt.title(f'Valid: {time_val:%Y-%m-%d %H:%M}Z', loc='right')
-        plt.xlabel(f'Temperature ({T.units:~P})')
-        plt.ylabel(f'Pressure ({p.units:~P})')
+        skew.ax.set_title(f'Skew-T Log-P for {station_name_long}', loc='left')
+        skew.ax.set_title(f'Valid: {time_val:%Y-%m-%d %H:%M}Z', loc='right')
+        skew.ax.set_xlabel(f'Temperature ({T.units:~P})')
+        skew.ax.set_ylabel(f'Pressure ({p.units:~P})')
         skew.ax.tick_params(axis='x', colors='black')
         skew.ax.tick_params(axis='y', colors='black')
         
         # --- 6a. Add Indices to Plot ---
-        indices_text = (
-            f'CAPE: {cape.magnitude:.2f} J/kg\n'
-            f'CIN: {cin.magnitude:.2f} J/kg\n'
-            f'{indices.get("Lifted Index", "Lifted Index: N/A")}\n'
-            f'{indices.get("Showalter Index", "Showalter Index: N/A")}\n'
-            f'{indices.get("K Index", "K Index: N/A")}\n'
-            f'{indices.get("Total Totals", "Total Totals: N/A")}\n'
-            f'{indices.get("Precipitable Water", "Precipitable Water: N/A")}\n'
-            f'{indices.get("0-6km Bulk Shear", "0-6km Bulk Shear: N/A")}'
-        )
+        indices_text = '\n'.join([
+            f'CAPE: {cape.magnitude:.2f} J/kg',
+            f'CIN: {cin.magnitude:.2f} J/kg',
+        ] + index_lines)
         
         # ### MODIFICATION START: MOVE TEXT BOX ###
         # Place text box in the upper-left corner of the plot axes
@@ -285,33 +422,56 @@ def plot_skewt_for_station(station_id, station_name_long, save_dir):
         # ### MODIFICATION END ###
 
         skew.ax.legend()
-        plt.grid(True)
+        skew.ax.grid(True)
 
-        # --- 7. Save and Show the Plot ---
+        # --- 7. Save the Plot ---
         os.makedirs(save_dir, exist_ok=True)
         date_str = time_val.strftime('%Y%m%d_%H%M')
         # Updated filename to reflect the station ID
         filename = f"{station_id}_sounding_{date_str}.png"
         filepath = os.path.join(save_dir, filename)
 
-        plt.savefig(filepath, bbox_inches='tight')
+        # Save the full 12x12 figure without a second 'tight' layout pass, using fast
+        # (lightly compressed) PNG encoding, then free the figure.
+        fig = skew.ax.figure
+        fig.savefig(filepath, dpi=100, bbox_inches=None, pil_kwargs={'compress_level': 1})
+        plt.close(fig)
         print(f"Plot saved to: {filepath}")
-        
-        plt.show()
-        print("Plot displayed.")
 
     except Exception as e:
         # This will catch errors in plotting or data processing *after* a successful download
         print(f"An error occurred during plot generation: {e}")
 
 
+def plot_skewt_for_stations(stations, save_dir, max_workers=8):
+    """
+    Plots the latest sounding for several stations. The downloads run in parallel
+    threads, since they are dominated by HTTP waits; each sounding is plotted in the
+    main thread as soon as it arrives, as matplotlib is not thread-safe.
+
+    Args:
+        stations (dict): Maps WMO station identifiers to the full names for the titles.
+        save_dir (str): The directory where the plots will be saved.
+        max_workers (int): Maximum number of concurrent downloads.
+    """
+    if not stations:
+        return # Nothing to fetch
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(stations))) as ex:
+        futures = {ex.submit(fetch_sounding, sid): sid for sid in stations}
+        for future in as_completed(futures):
+            sid = futures[future]
+            plot_skewt_for_station(sid, stations[sid], save_dir, sounding=future.result())
+
+
 # --- Main execution ---
 if __name__ == '__main__':
-    # WMO ID for Thessaloniki, Makedonia Airport is 16622
-    thessaloniki_station_id = '16622'
-    station_full_name = 'Thessaloniki International Airport (LGTS)'
+    # WMO ID for Thessaloniki, Makedonia Airport is 16622.
+    # Add more WMO IDs here to plot several stations in one run.
+    stations = {
+        '16622': 'Thessaloniki International Airport (LGTS)',
+    }
     # Define the directory to save the sounding plot
     # Make sure this path is correct for your system
     save_directory = '/home/dimitris/weather_station/upper_air_soundings'
     
-    plot_skewt_for_station(thessaloniki_station_id, station_full_name, save_directory)
+    plot_skewt_for_stations(stations, save_directory)
@@ -26,12 +26,18 @@ sensor = DFRobot_RainfallSensor_I2C()
 # Path to the CSV file for logging
 CSV_FILE_PATH = "/home/dimitris/weather_station/weather_station_data.csv"
 
+# The raw tipping bucket count is polled every POLL_INTERVAL seconds so each tip is
+# logged promptly; the full sensor summary is printed every REPORT_INTERVAL seconds.
+POLL_INTERVAL = 1.0
+REPORT_INTERVAL = 60
+
 # Global variables to store baseline values and previous readings
 baseline_rainfall = None  # Baseline reading at the beginning of the day
 last_rainfall = None      # Last recorded rainfall (in mm)
 last_time = None          # Time of last reading (in seconds)
 raw_data_prev = None      # Previous raw tipping bucket count
 current_day = None        # To track the current day in UTC
+last_report = 0.0         # time.monotonic() of the last console summary
 
 def initialize_day():
     """
@@ -39,7 +45,7 @@ def initialize_day():
     This version uses UTC for the date.
     """
     global baseline_rainfall, current_day
-    current_day = datetime.datetime.utcnow().date()
+    current_day = datetime.datetime.now(datetime.timezone.utc).date()
     baseline_rainfall = sensor.get_rainfall()
     print("New day detected (UTC). Baseline rainfall set to: %f mm" % baseline_rainfall)
 
@@ -82,39 +88,29 @@ def log_to_csv(timestamp, daily_total):
     except Exception as e:
         print("Error writing to CSV file:", e)
 
-def loop():
+def report(current_raw):
     """
-    Main loop that reads sensor data, calculates rain intensity (mm/h) based on the time difference
-    between readings, computes the total precipitation since midnight (UTC), and logs new tipping events.
+    Print the periodic sensor summary and update the values used for the
+    rain intensity (mm/h), which is averaged over the time since the last report.
     """
-    global last_rainfall, last_time, raw_data_prev, current_day, baseline_rainfall
+    global last_rainfall, last_time
     current_time = time.time()
-    # Use UTC time for logging
-    current_datetime = datetime.datetime.utcnow()
-    
-    # Check if a new UTC day has started
-    if datetime.datetime.utcnow().date() != current_day:
-        initialize_day()
-    
-    # Get sensor measurements
     workingtime = sensor.get_sensor_working_time()  # Sensor operating time in hours
     current_rainfall = sensor.get_rainfall()        # Total rainfall in mm (cumulative)
-    
+
     # Calculate rain intensity (mm/h) using the difference over time
     time_diff = current_time - last_time
     if time_diff > 0:
         intensity = (current_rainfall - last_rainfall) / time_diff * 3600
     else:
         intensity = 0.0
-    
+
     # Calculate total precipitation since the beginning of the day (UTC)
     daily_total = current_rainfall - baseline_rainfall
-    
+
     # Example: Get rainfall in the past hour (if available)
     one_hour_rainfall = sensor.get_rainfall_time(1)
-    # Get the raw tipping bucket count
-    current_raw = sensor.get_raw_data()
-    
+
     # Display the readings
     print("Working time         : %f H" % workingtime)
     print("Total Rainfall       : %f mm" % current_rainfall)
@@ -123,9 +119,34 @@ def loop():
     print("Rain intensity       : %f mm/h" % intensity)
     print("Raw tipping bucket   : %d" % current_raw)
     print("--------------------------------------------------------------------")
-    
+
+    # Update previous values for the next report
+    last_rainfall = current_rainfall
+    last_time = current_time
+
+def loop():
+    """
+    Main loop that polls the raw tipping bucket count every POLL_INTERVAL seconds
+    and, only when it changes, reads the rainfall and logs the total precipitation
+    since midnight (UTC). The remaining sensor reads and the console summary run
+    every REPORT_INTERVAL seconds.
+    """
+    global raw_data_prev, last_report
+    # Use UTC time for logging
+    current_datetime = datetime.datetime.now(datetime.timezone.utc)
+
+    # Check if a new UTC day has started
+    if current_datetime.date() != current_day:
+        initialize_day()
+
+    # Get the raw tipping bucket count (a single cheap I2C read)
+    current_raw = sensor.get_raw_data()
+
     # Check if the tipping bucket has just tipped (i.e. raw data has changed)
     if current_raw != raw_data_prev:
+        current_rainfall = sensor.get_rainfall()        # Total rainfall in mm (cumulative)
+        # Calculate total precipitation since the beginning of the day (UTC)
+        daily_total = current_rainfall - baseline_rainfall
         # --- MODIFICATION START ---
         # Validate the daily_total before logging to avoid erroneous data.
         # Only log if the value is between 0 and 1000 (inclusive).
@@ -139,12 +160,12 @@ def loop():
         # --- MODIFICATION END ---
         
         raw_data_prev = current_raw
-    
-    # Update previous values for next iteration
-    last_rainfall = current_rainfall
-    last_time = current_time
-    
-    time.sleep(60)
+
+    if time.monotonic() - last_report >= REPORT_INTERVAL:
+        report(current_raw)
+        last_report = time.monotonic()
+
+    time.sleep(POLL_INTERVAL)
 
 if __name__ == "__main__":
     setup()
@@ -5,18 +5,45 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State, Patch
+from dash.exceptions import PreventUpdate
+from flask import send_file, abort
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from datetime import datetime, timedelta, date
+import plotly.io as pio
+from datetime import datetime, timedelta, timezone, date
 from zoneinfo import ZoneInfo  # Python 3.9+
 import io
 import math
+import tempfile
+import threading
+import time
+from functools import lru_cache
 import ephem
 import imageio
 
+try:
+    from tsdownsample import MinMaxLTTBDownsampler
+except ImportError:
+    MinMaxLTTBDownsampler = None  # Plot every point if tsdownsample is not installed
+
+from _dashboard_numba import ffill_columns
+
+try:
+    import orjson  # noqa: F401
+    # Encode the callback figures with orjson instead of the pure-Python json encoder
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None  # No parquet sidecar without pyarrow
+
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
@@ -58,113 +85,338 @@ app.index_string = '''
 </html>
 '''
 
-cached_df = None
-last_load_time = None
-CACHE_TIMEOUT_SECONDS = 4 # Update interval is 5s, so we cache for 4s
-
 CSV_PATH = "weather_station_data.csv"
+# On a cold start the CSV is read backwards in TAIL_CHUNK pieces until the oldest
+# line read is TAIL_MARGIN older than the dashboard window (rows from different
+# sensors are not strictly in time order)
+TAIL_CHUNK = 1 << 20  # bytes
+TAIL_MARGIN = timedelta(minutes=10)
+# Only rows from the last WINDOW_HOURS are kept in memory for the figures
+WINDOW_HOURS = 24
+# Parsed rows are also kept in a parquet file next to the CSV, so a restarted
+# dashboard can resume from it instead of parsing the CSV tail again.
+PARQUET_PATH = "weather_station_data.parquet"
+PARQUET_SAVE_INTERVAL = 60  # seconds
+
+FFILLED_COLS = [
+    "Temperature (BME280) (°C)",
+    "Humidity (BME280) (%)",
+    "Pressure (BME280) (hPa)",
+    "Light Intensity (BH1750) (lux)"
+]
+
+# Incremental reader state: the rows parsed so far, the byte offset of the first
+# unread line, the CSV header and the inode of the file they were read from. Only
+# bytes appended after _CACHE_OFFSET are parsed on each refresh.
+_CACHE_DF = None
+_CACHE_OFFSET = 0
+_HEADER = None
+_CACHE_INODE = None
+_last_parquet_save = 0.0
+# The dev server runs callbacks in threads, and several of them miss the cache on the
+# same tick; the lock makes them update the state above one after the other.
+_CACHE_LOCK = threading.Lock()
+
+
+def _read_initial_tail():
+    """Read the header and the lines at the end of the CSV that cover the dashboard window."""
+    # Timestamps are fixed-width, so they can be compared as bytes
+    stop = (_threshold_utc() - TAIL_MARGIN).strftime("%Y-%m-%d %H:%M:%S").encode()
+    with open(CSV_PATH, "rb") as f:
+        header = f.readline().decode("utf-8").strip().split(",")
+        header_end = f.tell()
+
+        # Go to the end of the file to determine its size
+        f.seek(0, os.SEEK_END)
+        end = pos = f.tell()
+        chunks = []
+
+        # Read backwards from the end of the file in chunks
+        while pos > header_end:
+            # Determine how far back to move the cursor
+            seek_amount = min(pos - header_end, TAIL_CHUNK)
+            pos -= seek_amount
+
+            # Move the cursor and read the chunk
+            f.seek(pos)
+            chunk = f.read(seek_amount)
+            chunks.append(chunk)
+
+            # Stop once the first complete line of the chunk is older than the window
+            first = chunk[chunk.find(b'\n') + 1:][:len(stop)]
+            if len(first) == len(stop) and first[4:5] == b"-" and first < stop:
+                break
+
+    buffer = b"".join(reversed(chunks))
+    # We might have started reading mid-line. Find the first full newline
+    # and take everything after it to ensure we have complete rows.
+    if pos > header_end:
+        buffer = buffer[buffer.find(b'\n') + 1:]
+    return header, buffer, end
+
+
+def _load_parquet_sidecar():
+    """
+    Return (df, offset, header) from the parquet sidecar, or None if it is missing,
+    does not match the CSV or holds no rows inside the dashboard window.
+    """
+    if pq is None or not os.path.exists(PARQUET_PATH):
+        return None
+    try:
+        table = pq.read_table(PARQUET_PATH)
+        offset = int(table.schema.metadata[b"csv_offset"])
+        with open(CSV_PATH, "rb") as f:
+            header = f.readline().decode("utf-8").strip().split(",")
+        if table.column_names != header or offset > os.path.getsize(CSV_PATH):
+            return None
+        df = table.to_pandas()
+        _add_epoch_ms(df)
+    except Exception as e:
+        print(f"Ignoring parquet cache: {e}")
+        return None
+    if df.empty or df["timestamp"].max() < _threshold_utc():
+        return None
+    return df, offset, header
+
+
+def _save_parquet_sidecar(df, offset, header):
+    """Write the parsed rows and the CSV offset they cover to the parquet sidecar."""
+    table = pa.Table.from_pandas(df[header], preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"csv_offset"] = str(offset).encode()
+    table = table.replace_schema_metadata(metadata)
+    # Write to a temporary file of its own first, so neither a crash nor a concurrent
+    # writer can leave a truncated sidecar
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(PARQUET_PATH)), suffix=".tmp")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, PARQUET_PATH)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+STRING_COLS = ["Lightning Detection (AS3935)", "Rain Event (LM393)"]
+# Extra column with the timestamp as epoch milliseconds, used as the x values of
+# the figures (Plotly reads numbers on a date axis as epoch ms)
+TS_MS_COL = "ts_ms"
+
+
+def _add_epoch_ms(df):
+    """Fill TS_MS_COL from the UTC timestamp column."""
+    # .values is the naive UTC datetime64 data, so no tz conversion pass is needed
+    df[TS_MS_COL] = df["timestamp"].values.astype("datetime64[ms]").view("int64")
+
+
+def _parse_rows(data, header):
+    """Parse complete CSV lines (without header) into a DataFrame."""
+    # Let the C parser produce float columns directly; only the two text columns stay strings.
+    # The pyarrow CSV reader is not an option here: it rejects the short rows that the
+    # sensor scripts write (e.g. wind rows ending after the wind columns), which the
+    # C parser pads with NaN. Restarts read pyarrow data from the parquet sidecar instead.
+    dtypes = {col: (str if col in STRING_COLS else "float64") for col in header}
+    dtypes["timestamp"] = str
+    read_args = dict(
+        names=header,
+        header=None,
+        encoding_errors="ignore",
+        engine="c",
+        low_memory=False,
+        float_precision="high"
+    )
+    try:
+        df = pd.read_csv(io.BytesIO(data), dtype=dtypes, **read_args)
+    except ValueError:
+        # A corrupted value in a numeric column: parse untyped and coerce it to NaN
+        df = pd.read_csv(io.BytesIO(data), dtype={col: str for col in ["timestamp"] + STRING_COLS if col in header}, **read_args)
+        numeric_cols = [col for col in dtypes if col not in ["timestamp"] + STRING_COLS]
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
 
-def load_data():
-    global cached_df, last_load_time
-    now = datetime.now()
+    # Parse the timestamps straight to UTC in one vectorized pass (data are in UTC);
+    # unparseable ones become NaT and fall outside the dashboard window
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y-%m-%d %H:%M:%S", errors="coerce", utc=True)
+    _add_epoch_ms(df)
+    return df
 
-    # 1. Check if a valid cache exists and is fresh
-    if cached_df is not None and last_load_time is not None:
-        if (now - last_load_time).total_seconds() < CACHE_TIMEOUT_SECONDS:
-            return cached_df
 
-    # 2. If cache is stale, load new data
-    try:
-        # --- OPTIMIZATION V2: Correctly read the tail of the CSV ---
-        num_lines_to_read = 5000
-        
-        with open(CSV_PATH, "rb") as f:
-            # Go to the end of the file to determine its size
-            f.seek(0, os.SEEK_END)
-            pos = f.tell()
-            buffer = bytearray()
-            
-            # Read backwards from the end of the file in chunks
-            while pos > 0 and buffer.count(b'\n') < num_lines_to_read + 1:
-                # Determine how far back to move the cursor
-                seek_amount = min(pos, 4096)
-                pos -= seek_amount
-                
-                # Move the cursor and read the chunk
-                f.seek(pos)
-                buffer = f.read(seek_amount) + buffer
-
-        # Decode the byte buffer to a string
-        tail_str = buffer.decode('utf-8', errors='ignore')
-        
-        # We might have started reading mid-line. Find the first full newline
-        # and take everything after it to ensure we have complete rows.
-        first_newline_pos = tail_str.find('\n')
-        if first_newline_pos != -1:
-            tail_str = tail_str[first_newline_pos + 1:]
-
-        # Get the header row from the top of the file
-        with open(CSV_PATH, 'r') as f:
-            header = f.readline()
-        
-        # Combine the header with the tail data
-        final_csv_data = header + tail_str
-        
-        # Read this smaller dataset into pandas
-        df = pd.read_csv(
-            io.StringIO(final_csv_data),
-            parse_dates=["timestamp"], # This should now work reliably
-            date_format="%Y-%m-%d %H:%M:%S",
-            low_memory=False
-        )
+def _ffill(df, seed):
+    """Forward-fill FFILLED_COLS of df in place, starting from the seed values."""
+    arr = np.array(df[FFILLED_COLS].to_numpy(dtype="float64"), order="F")  # writable copy
+    ffill_columns(arr, seed)
+    df[FFILLED_COLS] = arr
 
-        # --- The rest of your processing logic remains the same ---
-        # Localize the naive timestamps to UTC (data are in UTC)
-        df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
 
-        # Filter for the last 24 hours. Use .copy() to prevent pandas warnings.
-        now_greece = datetime.now(ZoneInfo("Europe/Athens"))
-        threshold = now_greece - timedelta(hours=24)
-        threshold_utc = threshold.astimezone(ZoneInfo("UTC"))
-        df = df[df["timestamp"] >= threshold_utc].copy()
+def _threshold_utc():
+    """Start of the window shown by the dashboard."""
+    # The same instant in any time zone, so no conversion via Europe/Athens is needed
+    return datetime.now(timezone.utc) - timedelta(hours=WINDOW_HOURS)
 
-        numeric_cols = [
-            col for col in df.columns
-            if col not in ["timestamp", "Lightning Detection (AS3935)", "Rain Event (LM393)"]
-        ]
-        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
 
-        ffilled_cols = [
-            "Temperature (BME280) (°C)",
-            "Humidity (BME280) (%)",
-            "Pressure (BME280) (hPa)",
-            "Light Intensity (BH1750) (lux)"
-        ]
-        df[ffilled_cols] = df[ffilled_cols].ffill()
+def _rows_since(df, start):
+    """Rows of df with a timestamp at or after start (a UTC datetime)."""
+    if df["timestamp"].is_monotonic_increasing:
+        # Rows are appended in time order: binary search for the first row to keep
+        return df.iloc[df["timestamp"].searchsorted(start):]
+    # Out-of-order or unparseable timestamps: fall back to a boolean mask
+    return df[df["timestamp"] >= start]
+
+
+def _trim_window(df):
+    """Drop the rows older than the dashboard window."""
+    return _rows_since(df, _threshold_utc())
+
+
+@lru_cache(maxsize=1)
+def _load_data_cached(mtime, size):
+    """
+    Bring the cached frame up to date with the CSV. The arguments are the file's
+    modification time and size, so the result is reused by every callback until the
+    CSV changes (the size also catches appends within the same mtime tick).
+    """
+    with _CACHE_LOCK:
+        return _update_cache()
+
+
+def _update_cache():
+    """Parse the bytes appended to the CSV since the last call into the cached frame."""
+    global _CACHE_DF, _CACHE_OFFSET, _HEADER, _CACHE_INODE, _last_parquet_save
+
+    st = os.stat(CSV_PATH)
+    if _CACHE_DF is None:
+        sidecar = _load_parquet_sidecar()
+        if sidecar is not None:
+            _CACHE_DF, _CACHE_OFFSET, _HEADER = sidecar
+            _CACHE_INODE = st.st_ino
 
-        # Update the cache
-        cached_df = df
-        last_load_time = now
-        return df
+    if _CACHE_DF is None or st.st_ino != _CACHE_INODE or st.st_size < _CACHE_OFFSET:
+        # First call, or the CSV was rotated/replaced/truncated: start from its tail
+        header, data, offset = _read_initial_tail()
+        cached = None
+    else:
+        header, cached = _HEADER, _CACHE_DF
+        with open(CSV_PATH, "rb") as f:
+            f.seek(_CACHE_OFFSET)
+            data = f.read()
+        offset = _CACHE_OFFSET + len(data)
+
+    # Leave a partially written last line for the next refresh
+    complete = data.rfind(b'\n') + 1
+    offset -= len(data) - complete
+    data = data[:complete]
+
+    if data.strip():
+        new = _parse_rows(data, header)
+        if cached is not None and not cached.empty:
+            # Forward-fill only the new rows, seeded with the last known values
+            seed = cached[FFILLED_COLS].iloc[-1].to_numpy(dtype="float64")
+            _ffill(new, seed)
+            df = pd.concat([cached, new], ignore_index=True)
+        else:
+            # Fill before trimming, so the lines read before the window seed its first rows
+            _ffill(new, np.full(len(FFILLED_COLS), np.nan))
+            df = new
+    elif cached is not None:
+        df = cached
+    else:
+        df = _parse_rows(b"", header)
+
+    # Drop rows that have left the window
+    df = _trim_window(df).reset_index(drop=True)
+
+    if pq is not None and offset != _CACHE_OFFSET and time.monotonic() - _last_parquet_save >= PARQUET_SAVE_INTERVAL:
+        try:
+            _save_parquet_sidecar(df, offset, header)
+            _last_parquet_save = time.monotonic()
+        except Exception as e:
+            print(f"Error writing parquet cache: {e}")
 
+    _CACHE_DF, _CACHE_OFFSET, _HEADER, _CACHE_INODE = df, offset, header, st.st_ino
+    return df
+
+
+def load_data():
+    try:
+        st = os.stat(CSV_PATH)
+        return _load_data_cached(st.st_mtime_ns, st.st_size)
     except FileNotFoundError:
         print(f"Error: {CSV_PATH} not found.")
-        cached_df = None
         return pd.DataFrame()
     except Exception as e:
         print(f"Error loading data: {e}")
-        cached_df = None
         return pd.DataFrame()
 
 
-def get_latest_cloud_camera_image():
-    files = glob.glob("whole_sky_camera/*.jpg")
-    if not files:
+def _latest_file(folder, extensions):
+    """
+    Return the path of the newest file (by creation time) in folder whose name
+    ends with one of extensions, or None. The folder is only scanned again when
+    its own modification time changes, i.e. when a file was added, removed or
+    renamed, instead of on every refresh.
+    """
+    try:
+        dir_mtime_ns = os.stat(folder).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _scan_latest_file(folder, extensions, dir_mtime_ns)
+
+@lru_cache(maxsize=8)
+def _scan_latest_file(folder, extensions, dir_mtime_ns):
+    # os.scandir gets the entry types without a stat() per file, unlike
+    # glob + os.path.getctime.
+    try:
+        with os.scandir(folder) as it:
+            entries = [
+                e for e in it
+                if e.name.endswith(extensions) and not e.name.startswith(".") and e.is_file()
+            ]
+    except FileNotFoundError:
+        return None
+    if not entries:
+        return None
+    return max(entries, key=lambda e: e.stat().st_ctime).path
+
+def _mtime_ns(path):
+    """Modification time of path, or None if it has gone away since the scan."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
         return None
-    latest_file = max(files, key=os.path.getctime)
-    with open(latest_file, "rb") as f:
+
+@lru_cache(maxsize=8)
+def _encode_image(path, mtime_ns, mime):
+    """
+    Read an image and return it as a base64 data URI. Keyed on the modification
+    time, so an unchanged image is not read and encoded again on every refresh.
+    """
+    with open(path, "rb") as f:
         encoded = base64.b64encode(f.read()).decode("utf-8")
-    return "data:image/jpeg;base64," + encoded
+    return f"data:{mime};base64," + encoded
+
+CLOUD_CAMERA_DIR = "whole_sky_camera"
+
+@server.route("/latest_sky.jpg")
+def latest_sky_image():
+    """
+    Serve the newest cloud camera image as a plain JPEG. conditional=True lets the
+    browser revalidate its copy (304) instead of downloading it again.
+    """
+    latest = _latest_file(CLOUD_CAMERA_DIR, (".jpg",))
+    if latest is None or not os.path.isfile(latest):
+        abort(404)
+    return send_file(os.path.abspath(latest), mimetype="image/jpeg", conditional=True)
+
+def get_latest_cloud_camera_image():
+    """
+    URL of the newest cloud camera image, or None if there is none. The image is
+    served by latest_sky_image instead of being embedded as base64 (a third
+    larger); the modification time in the query changes the URL for a new image.
+    """
+    latest = _latest_file(CLOUD_CAMERA_DIR, (".jpg",))
+    mtime_ns = _mtime_ns(latest) if latest else None
+    if mtime_ns is None:
+        return None
+    return app.get_relative_path("/latest_sky.jpg") + f"?v={mtime_ns}"
 
 def get_camera_gif():
     # Get list of jpg files in the whole_sky_camera folder
@@ -190,48 +442,43 @@ def get_camera_gif():
 
 def get_satellite_image():
     path = "/home/dimitris/weather_station/satellite_latest/satellite_greece.jpg"
-    if not os.path.exists(path):
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
         return None
-    with open(path, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode("utf-8")
-    return "data:image/jpeg;base64," + encoded
+    return _encode_image(path, mtime_ns, "image/jpeg")
 
 def get_latest_anomaly_map():
     """
     Finds the latest temperature anomaly map from the specified folder,
     encodes it in base64, and returns it as a data URI.
     """
-    folder_path = "/home/dimitris/weather_station/temp_anomaly_map/*.png"
-    files = glob.glob(folder_path)
-    if not files:
+    latest = _latest_file("/home/dimitris/weather_station/temp_anomaly_map", (".png",))
+    mtime_ns = _mtime_ns(latest) if latest else None
+    if mtime_ns is None:
         return None
-    # Find the latest file based on creation time
-    latest_file = max(files, key=os.path.getctime)
-    with open(latest_file, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode("utf-8")
     # Return the data URI for the PNG image
-    return "data:image/png;base64," + encoded
+    return _encode_image(latest, mtime_ns, "image/png")
 
 def get_latest_upper_air_sounding_image():
     """
     Finds the latest upper air sounding figure from the specified folder,
     encodes it in base64, and returns it as a data URI.
     """
-    folder_path = "/home/dimitris/weather_station/upper_air_soundings/*"
     # Look for common image file extensions
-    files = [f for f in glob.glob(folder_path) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-    if not files:
+    latest = _latest_file(
+        "/home/dimitris/weather_station/upper_air_soundings",
+        (".png", ".jpg", ".jpeg", ".PNG", ".JPG", ".JPEG")
+    )
+    mtime_ns = _mtime_ns(latest) if latest else None
+    if mtime_ns is None:
         return None
-    # Find the latest file based on creation time
-    latest_file = max(files, key=os.path.getctime)
-    with open(latest_file, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode("utf-8")
     # Determine image type from extension for the data URI
-    file_ext = os.path.splitext(latest_file)[1][1:].lower()
+    file_ext = os.path.splitext(latest)[1][1:].lower()
     if file_ext == 'jpg':
         file_ext = 'jpeg' # common practice for data URIs
     # Return the data URI for the image
-    return f"data:image/{file_ext};base64," + encoded
+    return _encode_image(latest, mtime_ns, f"image/{file_ext}")
 
 # Common font settings for figures
 common_font = dict(family="Roboto, sans-serif")
@@ -240,61 +487,144 @@ axis_title_font = dict(size=16, family="Roboto, sans-serif")
 tick_font = dict(size=14, family="Roboto, sans-serif")
 legend_font = dict(size=16, family="Roboto, sans-serif")
 
+# Layout pieces shared by the time series figures. Plotly copies them into each
+# figure; extend them with {**DICT, ...} instead of modifying them.
+TIME_XAXIS = dict(
+    type="date",
+    showticklabels=True,
+    tickfont=tick_font,
+    title=dict(text="Time (UTC)", font=axis_title_font),
+    showgrid=True,
+    gridcolor="#f0f0f0",
+    rangeslider=dict(visible=False),
+    showline=True,
+    linewidth=2,
+    linecolor="#303030"
+)
+VALUE_YAXIS = dict(
+    tickfont=tick_font,
+    gridcolor="#f0f0f0",
+    showgrid=True,
+    showline=True,
+    linewidth=2,
+    linecolor="#303030"
+)
+FIGURE_MARGIN = dict(b=120, t=40, l=60, r=30)
+BOTTOM_LEGEND = dict(
+    orientation="h",
+    font=legend_font,
+    x=0.5,
+    xanchor="center",
+    y=-0.2,
+    yanchor="top"
+)
+# Axis defaults of Plotly's "plotly" template that the time series figures rely on
+_TEMPLATE_AXIS = dict(
+    automargin=True,
+    zerolinecolor="white",
+    zerolinewidth=2,
+    title=dict(standoff=15)
+)
+# Template of the 900x500 time series figures. A figure carries its whole template,
+# and the default "plotly" one holds styles for every trace type (heatmaps, maps, 3D
+# scenes, ...), about 7 kB per figure; this keeps only the parts these figures draw
+# plus the settings they share. It is set on each figure rather than registered as
+# the default template, which would also restyle the gauge, compass and wind rose.
+WEATHER_TEMPLATE = go.layout.Template(
+    layout=dict(
+        autotypenumbers="strict",
+        colorway=pio.templates["plotly"].layout.colorway,
+        font={**common_font, "color": "#2a3f5f"},
+        hovermode="closest",
+        hoverlabel=dict(align="left"),
+        paper_bgcolor="white",
+        plot_bgcolor="whitesmoke",
+        margin=FIGURE_MARGIN,
+        dragmode=False,
+        legend=BOTTOM_LEGEND,
+        xaxis=_TEMPLATE_AXIS,
+        yaxis=_TEMPLATE_AXIS,
+        shapedefaults=dict(line=dict(color="#2a3f5f")),
+        annotationdefaults=dict(arrowcolor="#2a3f5f", arrowhead=0, arrowwidth=1)
+    ),
+    data=dict(bar=[go.Bar(marker=dict(line=dict(color="#E5ECF6", width=0.5)))])
+)
+BASE_LAYOUT = dict(
+    template=WEATHER_TEMPLATE,
+    width=900,
+    height=500,
+    # Keep legend selections when a refresh only replaces the trace data
+    uirevision="static"
+)
+
+def _figure_title(text):
+    """Left-aligned figure title."""
+    return dict(text=text, x=0.05, xanchor="left", font=title_font)
+
+@lru_cache(maxsize=None)
+def _display_name(col):
+    """Trace name for a CSV column: the text before the sensor/unit parentheses."""
+    return col.split("(")[0].strip()
+
+# Maximum number of points sent to the browser per line trace
+MAX_TRACE_POINTS = 2000
+# Plotly sends NumPy arrays to the browser as binary typed arrays, so float32 trace
+# values halve the figure payload. The DataFrame itself stays float64: the summary
+# table and status text print its values, and float32 would show 12.600000381469727.
+TRACE_DTYPE = "float32"
+
+def _ds(x, y, n=MAX_TRACE_POINTS):
+    """
+    Downsample one time series with MinMaxLTTB so the figure JSON stays small.
+    x is the epoch-ms column and y a sensor column of the same frame; NaN values of y are dropped first.
+    Returns plain NumPy arrays, which Plotly encodes without iterating a Series.
+    """
+    valid = y.notna().to_numpy()
+    x = x.to_numpy(dtype="int64")[valid]
+    y = y.to_numpy(dtype="float64")[valid]
+    if len(y) <= n:
+        return x, y.astype(TRACE_DTYPE)
+    if MinMaxLTTBDownsampler is None:
+        idx = _m4_indices(x, y, n // 4)
+    else:
+        idx = MinMaxLTTBDownsampler().downsample(x, y, n_out=n)
+    return x[idx], y[idx].astype(TRACE_DTYPE)
+
+def _m4_indices(x, y, n_buckets):
+    """
+    M4 downsampling for when tsdownsample is not installed: split the time range
+    into n_buckets equal buckets and keep the first, last, min and max point of
+    each, which draws the same line at that width. x must be sorted.
+    """
+    bucket = (x - x[0]) * n_buckets // (x[-1] - x[0] + 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(x)] - 1
+    # Sorting by (bucket, y) puts each bucket's min first and max last
+    order = np.lexsort((y, bucket))
+    return np.unique(np.concatenate([starts, ends, order[starts], order[ends]]))
+
 # Update each plotting function to include a landscape width (900px)
 
 def create_line_figure(df, y_cols, title, ytitle):
     fig = go.Figure()
     for col in y_cols:
         if col in df.columns:
+            x, y = _ds(df[TS_MS_COL], df[col])
             fig.add_trace(
                 go.Scattergl(
-                    x=df["timestamp"],
-                    y=df[col],
+                    x=x,
+                    y=y,
                     mode="lines",
                     connectgaps=True,
-                    name=col.split("(")[0].strip(),
+                    name=_display_name(col),
                     line=dict(width=2)
                 )
             )
     fig.update_layout(
-        xaxis=dict(
-            type="date",
-            tickformat="%H:%M",  # Display date and time
-            showticklabels=True,
-            tickangle=0,
-            tickfont=tick_font,
-            title=dict(text="Time (UTC)", font=axis_title_font),
-            showgrid=True,
-            gridcolor="#f0f0f0",
-            rangeslider=dict(visible=False),
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
-        yaxis=dict(
-            title=dict(text=ytitle, font=axis_title_font),
-            tickfont=tick_font,
-            gridcolor="#f0f0f0",
-            showgrid=True,
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
-        margin=dict(b=120, t=40, l=60, r=30),
-        title=dict(text=title, x=0.05, xanchor="left", font=title_font),
-        width=900,
-        height=500,
-        plot_bgcolor="whitesmoke",
-        dragmode=False,
-        font=common_font,
-        legend=dict(
-            orientation="h",
-            font=legend_font,
-            x=0.5,
-            xanchor="center",
-            y=-0.2,
-            yanchor="top"
-        )
+        BASE_LAYOUT,
+        xaxis={**TIME_XAXIS, "tickformat": "%H:%M", "tickangle": 0},
+        yaxis={**VALUE_YAXIS, "title": dict(text=ytitle, font=axis_title_font)},
+        title=_figure_title(title)
     )
     return fig
 
@@ -303,154 +633,133 @@ def create_bar_figure(df, col, title, ytitle):
     if col in df.columns:
         fig.add_trace(
             go.Bar(
-                x=df["timestamp"],
-                y=df[col],
-                name=col.split(" (")[0],
+                x=df[TS_MS_COL].to_numpy(),
+                y=df[col].to_numpy(dtype=TRACE_DTYPE),
+                name=_display_name(col),
                 marker_color="royalblue"
             )
         )
     # Set up y-axis configuration.
-    yaxis_config = dict(
-        title=dict(text=ytitle, font=axis_title_font),
-        tickfont=tick_font,
-        gridcolor="#f0f0f0",
-        showgrid=True,
-        showline=True,
-        linewidth=2,
-        linecolor="#303030"
-    )
+    yaxis_config = {**VALUE_YAXIS, "title": dict(text=ytitle, font=axis_title_font)}
     # If this is the Rain Accumulation graph, force the minimum to 0.
     if col == "Rain Accumulation (SEN0575) (mm)":
         yaxis_config["rangemode"] = "tozero"
 
     fig.update_layout(
-        xaxis=dict(
-            type="date",
-            showticklabels=True,
-            tickfont=tick_font,
-            title=dict(text="Time (UTC)", font=axis_title_font),
-            showgrid=True,
-            gridcolor="#f0f0f0",
-            rangeslider=dict(visible=False),
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
+        BASE_LAYOUT,
+        xaxis=TIME_XAXIS,
         yaxis=yaxis_config,
-        margin=dict(b=120, t=40, l=60, r=30),
-        title=dict(text=title, x=0.05, xanchor="left", font=title_font),
-        width=900,
-        height=500,
-        plot_bgcolor="whitesmoke",
-        dragmode=False,
-        font=common_font,
-        legend=dict(
-            orientation="h",
-            font=legend_font,
-            x=0.5,
-            xanchor="center",
-            y=-0.2,
-            yanchor="top"
-        )
+        title=_figure_title(title)
     )
     return fig
 
+# Time step of the rain accumulation line
+RAIN_LINE_INTERVAL = "10min"
+
+def _rain_line_points(df, col, freq=RAIN_LINE_INTERVAL):
+    """
+    Points of the rain accumulation line, one per freq bucket instead of one per
+    sample: the time of the bucket's latest reading and its highest total. The
+    column holds the total since UTC midnight (see rainfall2.py), which only grows
+    during a day, and the buckets never span midnight, so that is the total at the
+    end of the bucket. Returns epoch ms and the totals.
+    """
+    rain = df[[TS_MS_COL, col]].set_index(df["timestamp"]).dropna(subset=[col])
+    buckets = rain.resample(freq).max().dropna()
+    return buckets[TS_MS_COL].to_numpy(dtype="int64"), buckets[col].to_numpy(dtype=TRACE_DTYPE)
+
 def create_rain_line_figure(df, col, title, ytitle):
     fig = go.Figure()
     if col in df.columns:
+        x, y = _rain_line_points(df, col)
         fig.add_trace(
             go.Scatter(
-                x=df["timestamp"],
-                y=df[col],
+                x=x,
+                y=y,
                 mode="lines",
-                name=col.split(" (")[0],
+                name=_display_name(col),
                 line=dict(width=2, color="blue"),
                 connectgaps=True
             )
         )
 
     # Force y-axis minimum to 0
-    yaxis_config = dict(
-        title=dict(text=ytitle, font=axis_title_font),
-        tickfont=tick_font,
-        gridcolor="#f0f0f0",
-        showgrid=True,
-        showline=True,
-        linewidth=2,
-        linecolor="#303030",
-        rangemode="tozero"
-    )
+    yaxis_config = {**VALUE_YAXIS, "title": dict(text=ytitle, font=axis_title_font), "rangemode": "tozero"}
 
     fig.update_layout(
-        xaxis=dict(
-            type="date",
-            tickformat="%m-%d %H:%M",
-            showticklabels=True,
-            tickfont=tick_font,
-            title=dict(text="Time (UTC)", font=axis_title_font),
-            showgrid=True,
-            gridcolor="#f0f0f0",
-            rangeslider=dict(visible=False),
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
+        BASE_LAYOUT,
+        xaxis={**TIME_XAXIS, "tickformat": "%m-%d %H:%M"},
         yaxis=yaxis_config,
-        margin=dict(b=120, t=40, l=60, r=30),
-        title=dict(text=title, x=0.05, xanchor="left", font=title_font),
-        width=900,
-        height=500,
-        plot_bgcolor="whitesmoke",
-        dragmode=False,
-        font=common_font,
-        legend=dict(
-            orientation="h",
-            font=legend_font,
-            x=0.5,
-            xanchor="center",
-            y=-0.2,
-            yanchor="top"
-        )
+        title=_figure_title(title)
     )
     return fig
 
 
+# Wind rose sectors and speed classes, and the matching long-form label columns
+# (one row per direction and speed class) of the table passed to px.bar_polar
+WIND_DIRECTIONS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+WIND_SPEED_BINS = np.array([0, 1, 2, 3, 4, 5, 6, 7, 10, 15, 25])
+WIND_SPEED_LABELS = ["0-1", "1-2", "2-3", "3-4", "4-5", "5-6", "6-7", "7-10", "10-15", "15+"]
+_ROSE_CARDINAL = np.repeat(WIND_DIRECTIONS, len(WIND_SPEED_LABELS))
+_ROSE_STRENGTH = np.tile(WIND_SPEED_LABELS, len(WIND_DIRECTIONS))
+
+WIND_DIR_COL = "Wind Direction (Wind Vane) (deg)"
+WIND_SPEED_COL = "Wind Speed (Anemometer) (m/s)"
+
+def _wind_rose_codes(df):
+    """
+    Wind rose bin of every row of df (direction sector * number of speed bins +
+    speed bin), or -1 where the direction is missing or the speed is outside the bins.
+    """
+    deg = df[WIND_DIR_COL].to_numpy(dtype="float64")
+    spd = df[WIND_SPEED_COL].to_numpy(dtype="float64")
+    codes = np.full(len(deg), -1, dtype=np.int64)
+
+    # 45° sectors centred on N, E, ...: shift by half a sector, floor-divide and
+    # wrap with & 7 (8 sectors), which also maps negative angles like % 360 would
+    valid = np.flatnonzero(~np.isnan(deg))
+    dir_idx = ((deg[valid] + 22.5) // 45).astype(np.int64) & 7
+    # Speed bins are closed on the right like pd.cut; speeds outside them are skipped
+    spd_idx = np.searchsorted(WIND_SPEED_BINS, spd[valid]) - 1
+    in_bins = (spd_idx >= 0) & (spd_idx < len(WIND_SPEED_LABELS))
+    codes[valid[in_bins]] = dir_idx[in_bins] * len(WIND_SPEED_LABELS) + spd_idx[in_bins]
+    return codes
+
+def _wind_rose_counts(codes):
+    """Number of samples per (cardinal direction, speed bin) for the given bin codes."""
+    return np.bincount(codes[codes >= 0], minlength=len(WIND_DIRECTIONS) * len(WIND_SPEED_LABELS))
+
+def _prep_wind(df):
+    """
+    Timestamps and wind rose bins of df, in time order, so the Wind Rose tab bins
+    the rows once for all of its time windows. None if df has no wind data.
+    """
+    if df.empty or WIND_DIR_COL not in df.columns or WIND_SPEED_COL not in df.columns:
+        return None
+    wind = pd.DataFrame({"timestamp": df["timestamp"], "code": _wind_rose_codes(df)})
+    if not wind["timestamp"].is_monotonic_increasing:
+        # Out-of-order or unparseable timestamps: sort once so that the windows can
+        # be cut with searchsorted (the counts do not depend on the row order)
+        wind = wind.dropna(subset=["timestamp"]).sort_values("timestamp", kind="stable")
+    return wind
+
 def create_wind_rose(df):
-    if df.empty or "Wind Direction (Wind Vane) (deg)" not in df.columns:
+    if df.empty or WIND_DIR_COL not in df.columns:
         return go.Figure()
     try:
-        wind_df = df[["Wind Direction (Wind Vane) (deg)", "Wind Speed (Anemometer) (m/s)"]].copy()
-        wind_df["deg"] = wind_df["Wind Direction (Wind Vane) (deg)"] % 360
-
-        def cardinal_direction(deg):
-            if deg < 22.5 or deg >= 337.5:
-                return "N"
-            elif deg < 67.5:
-                return "NE"
-            elif deg < 112.5:
-                return "E"
-            elif deg < 157.5:
-                return "SE"
-            elif deg < 202.5:
-                return "S"
-            elif deg < 247.5:
-                return "SW"
-            elif deg < 292.5:
-                return "W"
-            elif deg < 337.5:
-                return "NW"
-
-        wind_df["cardinal"] = wind_df["deg"].apply(cardinal_direction)
-
-        speed_bins = [0, 1, 2, 3, 4, 5, 6, 7, 10, 15, 25]
-        speed_labels = ["0-1", "1-2", "2-3", "3-4", "4-5", "5-6", "6-7", "7-10", "10-15", "15+"]
-        wind_df["strength"] = pd.cut(
-            wind_df["Wind Speed (Anemometer) (m/s)"],
-            bins=speed_bins,
-            labels=speed_labels
-        )
+        return _wind_rose_figure(_wind_rose_counts(_wind_rose_codes(df)))
+    except Exception as e:
+        print(f"Wind rose error: {e}")
+        return go.Figure()
 
-        wind_df = wind_df.groupby(["cardinal", "strength"], observed=False).size().reset_index(name="frequency")
+def _wind_rose_figure(counts):
+    """Wind rose of the counts per (cardinal direction, speed bin), see _wind_rose_counts."""
+    try:
+        wind_df = pd.DataFrame({
+            "cardinal": _ROSE_CARDINAL,
+            "strength": _ROSE_STRENGTH,
+            "frequency": counts
+        })
 
         fig = px.bar_polar(
             wind_df,
@@ -468,10 +777,10 @@ def create_wind_rose(df):
             polar=dict(
                 angularaxis=dict(
                     tickmode="array",
-                    tickvals=["N", "NE", "E", "SE", "S", "SW", "W", "NW"],
-                    ticktext=["N", "NE", "E", "SE", "S", "SW", "W", "NW"],
+                    tickvals=WIND_DIRECTIONS,
+                    ticktext=WIND_DIRECTIONS,
                     categoryorder="array",
-                    categoryarray=["N", "NE", "E", "SE", "S", "SW", "W", "NW"],
+                    categoryarray=WIND_DIRECTIONS,
                     tickfont=tick_font,
                     gridcolor="#f0f0f0"
                 ),
@@ -482,14 +791,7 @@ def create_wind_rose(df):
             
             margin=dict(t=80, b=80, l=80, r=80),
             font=common_font,
-            legend=dict(
-                orientation="h",
-                font=legend_font,
-                x=0.5,
-                xanchor="center",
-                y=-0.2,
-                yanchor="top"
-            )
+            legend=BOTTOM_LEGEND
         )
         return fig
     except Exception as e:
@@ -499,13 +801,16 @@ def create_wind_rose(df):
 def create_temperature_figure(df):
     fig = go.Figure()
 
+    # WebGL traces, like create_line_figure: the markers of the MCP9808 trace are
+    # the slowest part of an SVG redraw
     # MCP9808 (red) with smaller markers
     col_mcp = "Temperature (MCP9808) (°C)"
     if col_mcp in df.columns:
+        x, y = _ds(df[TS_MS_COL], df[col_mcp])
         fig.add_trace(
-            go.Scatter(
-                x=df["timestamp"],
-                y=df[col_mcp],
+            go.Scattergl(
+                x=x,
+                y=y,
                 mode="lines+markers",
                 name="MCP9808",
                 line=dict(width=2, color="red"),
@@ -516,10 +821,11 @@ def create_temperature_figure(df):
     # BME280 (blue) with slightly transparent line
     col_bme = "Temperature (BME280) (°C)"
     if col_bme in df.columns:
+        x, y = _ds(df[TS_MS_COL], df[col_bme])
         fig.add_trace(
-            go.Scatter(
-                x=df["timestamp"],
-                y=df[col_bme],
+            go.Scattergl(
+                x=x,
+                y=y,
                 mode="lines",
                 name="BME280",
                 line=dict(width=2, color="blue", dash="solid"),
@@ -528,43 +834,10 @@ def create_temperature_figure(df):
         )
 
     fig.update_layout(
-        xaxis=dict(
-            type="date",
-            tickformat="%H:%M",
-            showticklabels=True,
-            tickangle=0,
-            tickfont=dict(size=14, family="Roboto, sans-serif"),
-            title=dict(text="Time (UTC)", font=dict(size=16, family="Roboto, sans-serif")),
-            showgrid=True,
-            gridcolor="#f0f0f0",
-            rangeslider=dict(visible=False),
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
-        yaxis=dict(
-            title=dict(text="Temperature (°C)", font=dict(size=16, family="Roboto, sans-serif")),
-            tickfont=dict(size=14, family="Roboto, sans-serif"),
-            gridcolor="#f0f0f0",
-            showgrid=True,
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
-        margin=dict(b=120, t=40, l=60, r=30),
-        title=dict(text="Temperature", x=0.05, xanchor="left", font=dict(size=20, family="Roboto, sans-serif")),
-        width=900,
-        height=500,
-        plot_bgcolor="whitesmoke",
-        dragmode=False,
-        legend=dict(
-            orientation="h",
-            font=dict(size=16, family="Roboto, sans-serif"),
-            x=0.5,
-            xanchor="center",
-            y=-0.2,
-            yanchor="top"
-        )
+        BASE_LAYOUT,
+        xaxis={**TIME_XAXIS, "tickformat": "%H:%M", "tickangle": 0},
+        yaxis={**VALUE_YAXIS, "title": dict(text="Temperature (°C)", font=axis_title_font)},
+        title=_figure_title("Temperature")
     )
     return fig
 
@@ -582,16 +855,18 @@ def create_air_quality_figure(df):
     ]
     for col in cols:
         if col in df.columns:
-            short_name = col.split("(")[0].strip()  # e.g., "PM1.0"
+            short_name = _display_name(col)  # e.g., "PM1.0"
             # For PM10.0, use the transparent green color
             if short_name == "PM10.0":
                 line_props = dict(width=2, shape='spline', smoothing=0.8, color='rgba(0, 128, 0, 0.5)')
             else:
                 line_props = dict(width=2, shape='spline', smoothing=0.8)
+            x, y = _ds(df[TS_MS_COL], df[col])
+            # Stays an SVG trace: Scattergl cannot draw spline lines
             fig.add_trace(
                 go.Scatter(
-                    x=df["timestamp"],
-                    y=df[col],
+                    x=x,
+                    y=y,
                     mode="lines",
                     name=short_name,
                     connectgaps=True,
@@ -622,46 +897,19 @@ def create_air_quality_figure(df):
         max_ts = df["timestamp"].max()
         min_ts = df["timestamp"].min()
         fig.update_layout(
-            xaxis=dict(
-                range=[min_ts, max_ts + pd.Timedelta(minutes=1)],
-                type="date",
-                tickformat="%H:%M",
-                showticklabels=True,
-                tickfont=tick_font,
-                title=dict(text="", font=axis_title_font),
-                showgrid=True,
-                gridcolor="#f0f0f0",
-                rangeslider=dict(visible=False),
-                showline=True,
-                linewidth=2,
-                linecolor="#303030"
-            )
+            xaxis={
+                **TIME_XAXIS,
+                "range": [min_ts, max_ts + pd.Timedelta(minutes=1)],
+                "tickformat": "%H:%M",
+                "title": dict(text="", font=axis_title_font)
+            }
         )
     fig.update_layout(
-        yaxis=dict(
-            title=dict(text="Concentration (µg/m³)", font=axis_title_font),
-            tickfont=tick_font,
-            gridcolor="#f0f0f0",
-            showgrid=True,
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
+        BASE_LAYOUT,
+        yaxis={**VALUE_YAXIS, "title": dict(text="Concentration (µg/m³)", font=axis_title_font)},
+        # Wider right margin for the threshold labels
         margin=dict(b=80, t=40, l=60, r=100),
-        title=dict(text="Air Quality Monitoring", x=0.05, xanchor="left", font=title_font),
-        width=900,
-        height=500,
-        plot_bgcolor="whitesmoke",
-        dragmode=False,
-        font=common_font,
-        legend=dict(
-            orientation="h",
-            font=legend_font,
-            x=0.5,
-            xanchor="center",
-            y=-0.2,
-            yanchor="top"
-        )
+        title=_figure_title("Air Quality Monitoring")
     )
     return fig
 
@@ -683,8 +931,12 @@ def create_wind_timeseries_figure(df):
     # Define the window size for the moving average. Assuming data is every 20s, 30 points = 10 minutes.
     window_size = 30
 
+    # The smoothed values are kept as local arrays: df is the cached frame shared by
+    # all callbacks, so no columns are added to it (and nothing needs copying)
+    ts_ms = df[TS_MS_COL].to_numpy()
+
     # Apply a simple rolling mean to wind speed
-    df['speed_smoothed'] = df['Wind Speed (Anemometer) (m/s)'].rolling(window=window_size, center=True, min_periods=1).mean()
+    speed_smoothed = df['Wind Speed (Anemometer) (m/s)'].rolling(window=window_size, center=True, min_periods=1).mean()
 
     # Apply a circular rolling average to wind direction
     radians = np.deg2rad(df['Wind Direction (Wind Vane) (deg)'])
@@ -695,13 +947,13 @@ def create_wind_timeseries_figure(df):
     avg_radians = np.arctan2(y_mean, x_mean)
 
     # --- CORRECTION IS HERE: Add 180 degrees to reverse the direction ---
-    df['direction_smoothed'] = (np.rad2deg(avg_radians) + 180) % 360
+    direction_smoothed = ((np.rad2deg(avg_radians) + 180) % 360).to_numpy(dtype=TRACE_DTYPE)
 
     # 1. Add SMOOTHED Wind Speed Line Trace
     fig.add_trace(
         go.Scatter(
-            x=df["timestamp"],
-            y=df["speed_smoothed"], # Use smoothed data
+            x=ts_ms,
+            y=speed_smoothed.to_numpy(dtype=TRACE_DTYPE), # Use smoothed data
             mode="lines",
             name="Wind Speed (10-min avg)",
             line=dict(color="royalblue", width=2),
@@ -712,21 +964,22 @@ def create_wind_timeseries_figure(df):
     # 2. Prepare data for Wind Direction Arrows
     # Take one point every 30 minutes (90 points) for clarity.
     # (30 mins * 60 secs/min) / 20 secs/reading = 90
-    df_arrows = df.iloc[::90].copy()
+    arrow_ms = ts_ms[::90]
+    arrow_angle = direction_smoothed[::90]
 
     # 3. Add Wind Direction Arrows Trace from SMOOTHED data
-    if not df_arrows.empty:
+    if len(arrow_ms):
         fig.add_trace(
             go.Scatter(
-                x=df_arrows["timestamp"],
-                y=[1] * len(df_arrows),
+                x=arrow_ms,
+                y=[1] * len(arrow_ms),
                 mode="markers",
                 name="Wind Direction",
                 marker=dict(
                     symbol="arrow",
                     color="rgba(200, 30, 30, 0.8)",
                     size=16,
-                    angle=df_arrows["direction_smoothed"], # Use smoothed and reversed data
+                    angle=arrow_angle, # Use smoothed and reversed data
                     angleref="up",
                     line=dict(width=1, color='DarkSlateGrey')
                 ),
@@ -741,46 +994,16 @@ def create_wind_timeseries_figure(df):
 
     # 4. Update Layout with dual Y-axes
     fig.update_layout(
-        title=dict(text="Wind Speed and Direction (10-Minute Moving Average)", x=0.05, xanchor="left", font=title_font),
-        xaxis=dict(
-            title=dict(text="Time (UTC)", font=axis_title_font),
-            tickfont=tick_font,
-            showgrid=True,
-            gridcolor="#f0f0f0",
-            showline=True,
-            linewidth=2,
-            linecolor="#303030",
-            rangeslider=dict(visible=False)
-        ),
-        yaxis=dict(
-            title=dict(text="Wind Speed (m/s)", font=y_axis_title_font),
-            tickfont=tick_font,
-            gridcolor="#f0f0f0",
-            showgrid=True,
-            showline=True,
-            linewidth=2,
-            linecolor="#303030"
-        ),
+        BASE_LAYOUT,
+        title=_figure_title("Wind Speed and Direction (10-Minute Moving Average)"),
+        xaxis=TIME_XAXIS,
+        yaxis={**VALUE_YAXIS, "title": dict(text="Wind Speed (m/s)", font=y_axis_title_font)},
         yaxis2=dict(
             visible=False,
             range=[0, 1.5],
             overlaying="y",
             anchor="x",
             side="right"
-        ),
-        margin=dict(b=120, t=40, l=60, r=30),
-        width=900,
-        height=500,
-        plot_bgcolor="whitesmoke",
-        dragmode=False,
-        font=common_font,
-        legend=dict(
-            orientation="h",
-            font=legend_font,
-            x=0.5,
-            xanchor="center",
-            y=-0.2,
-            yanchor="top"
         )
     )
 
@@ -913,78 +1136,84 @@ def create_dashboard(df):
         "PM10.0 (PMSA003I) (µg/m³)": 50
     }
 
+    # Row positions of the latest, min and max valid value of every parameter,
+    # found in one pass over the table instead of filtering it per parameter
+    params = [param for param in dashboard_parameters if param in df.columns]
+    values = df[params].to_numpy(dtype="float64")
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=0)
+    ts_ns = df["timestamp"].values.view("int64")
+    # argmin/argmax return the first position on ties, like idxmin/idxmax
+    latest_pos = np.where(valid, ts_ns[:, None], np.iinfo(np.int64).min).argmax(axis=0)
+    min_pos = np.where(valid, values, np.inf).argmin(axis=0)
+    max_pos = np.where(valid, values, -np.inf).argmax(axis=0)
+    timestamps = df["timestamp"]
+
+    def local_hhmm(pos):
+        return timestamps.iloc[pos].astimezone(ZoneInfo("Europe/Athens")).strftime("%H:%M")
+
     rows = []
-    for param in dashboard_parameters:
-        if param in df.columns:
-            df_param = df[df[param].notnull()]
-            # Determine the display parameter name.
-            if param.startswith("UV Index"):
-                display_param = "UV Index"
-            elif param.startswith("Wind Speed"):
-                display_param = "Wind Speed (km/h)"
-            else:
-                # Keep text before the first parenthesis and add the unit from the last parentheses.
-                unit_start = param.rfind("(")
-                if unit_start != -1:
-                    unit_str = param[unit_start:].strip()  # e.g., "(°C)" or "(µg/m³)"
-                    display_param = param.split(" (")[0] + " " + unit_str
-                else:
-                    display_param = param
-
-            if df_param.empty:
-                latest_value = "N/A"
-                stats_str = ""
+    for j, param in enumerate(params):
+        # Determine the display parameter name.
+        if param.startswith("UV Index"):
+            display_param = "UV Index"
+        elif param.startswith("Wind Speed"):
+            display_param = "Wind Speed (km/h)"
+        else:
+            # Keep text before the first parenthesis and add the unit from the last parentheses.
+            unit_start = param.rfind("(")
+            if unit_start != -1:
+                unit_str = param[unit_start:].strip()  # e.g., "(°C)" or "(µg/m³)"
+                display_param = param.split(" (")[0] + " " + unit_str
             else:
-                # Latest measurement (for simplicity, using the row with the max timestamp)
-                latest_row = df_param.loc[df_param["timestamp"].idxmax()]
-                latest_value = latest_row[param]
-                # Special handling for Wind Speed: convert m/s to km/h.
+                display_param = param
+
+        value_style = {}
+        if not has_data[j]:
+            latest_value = "N/A"
+            stats_str = ""
+        else:
+            # Latest measurement (the row with the max timestamp)
+            latest_value = values[latest_pos[j], j]
+            # Special handling for Wind Speed: convert m/s to km/h.
+            if param == "Wind Speed (Anemometer) (m/s)":
+                latest_value = round(latest_value * 3.6, 1)
+
+            max_val = values[max_pos[j], j]
+            if extra_stats.get(param) == "minmax":
+                # Min and max values and their timestamps.
+                min_val = values[min_pos[j], j]
+                # For wind speed, convert values from m/s to km/h.
                 if param == "Wind Speed (Anemometer) (m/s)":
-                    latest_value = round(latest_value * 3.6, 1)
-
-                if extra_stats.get(param) == "minmax":
-                    # Calculate min and max values and their timestamps.
-                    min_val = df_param[param].min()
-                    max_val = df_param[param].max()
-                    min_row = df_param[df_param[param] == min_val].iloc[0]
-                    max_row = df_param[df_param[param] == max_val].iloc[0]
-                    # For wind speed, convert values from m/s to km/h.
-                    if param == "Wind Speed (Anemometer) (m/s)":
-                        min_val = round(min_val * 3.6, 1)
-                        max_val = round(max_val * 3.6, 1)
-                    # Format timestamps to show only hour and minute.
-                    min_ts = min_row["timestamp"].astimezone(ZoneInfo("Europe/Athens")).strftime("%H:%M")
-                    max_ts = max_row["timestamp"].astimezone(ZoneInfo("Europe/Athens")).strftime("%H:%M")
-                    stats_str = f"Min: {min_val} ({min_ts}), Max: {max_val} ({max_ts})"
-                elif extra_stats.get(param) == "max":
-                    max_val = df_param[param].max()
-                    max_row = df_param[df_param[param] == max_val].iloc[0]
-                    if param == "Wind Speed (Anemometer) (m/s)":
-                        max_val = round(max_val * 3.6, 1)
-                    max_ts = max_row["timestamp"].astimezone(ZoneInfo("Europe/Athens")).strftime("%H:%M")
-                    stats_str = f"Max: {max_val} ({max_ts})"
-                else:
-                    stats_str = ""
-
-                # For PM parameters, if the latest and maximum values exceed thresholds, apply bold red styling.
-                value_style = {}
-                if param in pm_thresholds and not df_param.empty:
-                    threshold = pm_thresholds[param]
-                    if latest_value > threshold:
-                        if extra_stats.get(param) == "minmax":
-                            max_val = df_param[param].max()
-                        else:
-                            max_val = None
-                        if (max_val is not None and max_val > threshold) or (max_val is None):
-                            value_style = {"color": "red", "fontWeight": "bold"}
-
-            rows.append(
-                html.Tr([
-                    html.Td(display_param, style={"padding": "8px", "border": "1px solid #ccc", "fontSize": "14px"}),
-                    html.Td(latest_value, style={"padding": "8px", "border": "1px solid #ccc", "fontSize": "14px", **value_style}),
-                    html.Td(stats_str, style={"padding": "8px", "border": "1px solid #ccc", "fontSize": "14px", **value_style})
-                ])
-            )
+                    min_val = round(min_val * 3.6, 1)
+                    max_val = round(max_val * 3.6, 1)
+                # Format timestamps to show only hour and minute.
+                stats_str = f"Min: {min_val} ({local_hhmm(min_pos[j])}), Max: {max_val} ({local_hhmm(max_pos[j])})"
+            elif extra_stats.get(param) == "max":
+                if param == "Wind Speed (Anemometer) (m/s)":
+                    max_val = round(max_val * 3.6, 1)
+                stats_str = f"Max: {max_val} ({local_hhmm(max_pos[j])})"
+            else:
+                stats_str = ""
+
+            # For PM parameters, if the latest and maximum values exceed thresholds, apply bold red styling.
+            if param in pm_thresholds:
+                threshold = pm_thresholds[param]
+                if latest_value > threshold:
+                    if extra_stats.get(param) == "minmax":
+                        max_val = values[max_pos[j], j]
+                    else:
+                        max_val = None
+                    if (max_val is not None and max_val > threshold) or (max_val is None):
+                        value_style = {"color": "red", "fontWeight": "bold"}
+
+        rows.append(
+            html.Tr([
+                html.Td(display_param, style={"padding": "8px", "border": "1px solid #ccc", "fontSize": "14px"}),
+                html.Td(latest_value, style={"padding": "8px", "border": "1px solid #ccc", "fontSize": "14px", **value_style}),
+                html.Td(stats_str, style={"padding": "8px", "border": "1px solid #ccc", "fontSize": "14px", **value_style})
+            ])
+        )
 
     # --- NEW: Add Daily Rainfall and Rain Intensity rows ---
     # Daily Rainfall: if the column exists, compute (max - min) over the day.
@@ -1000,8 +1229,7 @@ def create_dashboard(df):
     if "Rain Accumulation (SEN0575) (mm)" in df.columns and "Rain Event (LM393)" in df.columns:
         # Check if the last rain event indicates "Rain"
         if not df[df["Rain Event (LM393)"].notnull()].empty and df[df["Rain Event (LM393)"].notnull()].iloc[-1]["Rain Event (LM393)"] == "Rain":
-            now_greece = datetime.now(ZoneInfo("Europe/Athens"))
-            df_last60 = df[df["timestamp"] >= now_greece.astimezone(ZoneInfo("UTC")) - timedelta(minutes=60)]
+            df_last60 = _rows_since(df, datetime.now(timezone.utc) - timedelta(minutes=60))
             if not df_last60.empty:
                 intensity = df_last60["Rain Accumulation (SEN0575) (mm)"].max() - df_last60["Rain Accumulation (SEN0575) (mm)"].min()
                 rain_intensity = round(intensity, 1)
@@ -1074,7 +1302,7 @@ def create_thermometer_dashboard(df):
     midnight_utc = midnight.astimezone(ZoneInfo("UTC"))
 
     # Filter data for today (from midnight onward)
-    df_today = df[df["timestamp"] >= midnight_utc]
+    df_today = _rows_since(df, midnight_utc)
     if df_today.empty:
         return go.Figure()
 
@@ -1246,6 +1474,10 @@ app.layout = html.Div(
         header,
         station_status,  # Displays last read timestamp and online/offline status
         dcc.Interval(id="interval", interval=5000),
+        # Modification time of the CSV the current tab content was built from (per browser tab)
+        dcc.Store(id="csv-mtime"),
+        # CSV mtime and minute the station status was built for
+        dcc.Store(id="status-key"),
         dcc.Tabs(
             id="tabs",
             value="Dashboard",
@@ -1288,16 +1520,32 @@ app.layout = html.Div(
     }
 )
 
-def create_wind_rose_range(df, time_delta, title_text):
-    # Get current UTC time
-    now_utc = datetime.now(ZoneInfo("UTC"))
-    # Filter the DataFrame based on the time_delta
-    filtered_df = df[df["timestamp"] >= now_utc - time_delta]
-    # Create the wind rose from the filtered data
-    fig = create_wind_rose(filtered_df)
-    # Update the title of the wind rose
-    fig.update_layout(title=dict(text=title_text, font=title_font))
-    return fig
+def create_wind_rose_ranges(wind, windows):
+    """
+    Wind roses of the prepared wind data (see _prep_wind) for nested time windows,
+    given as (start, title) pairs from the longest to the shortest. The counts are
+    built from the shortest window out, each window adding only the rows before the
+    previous one, so every row is counted once.
+    """
+    if wind is None:
+        codes = np.empty(0, dtype=np.int64)
+        cuts = [0] * len(windows)
+    else:
+        codes = wind["code"].to_numpy()
+        cuts = wind["timestamp"].searchsorted([start for start, _ in windows])
+
+    figures = []
+    counts = _wind_rose_counts(codes[:0])
+    end = len(codes)
+    for (start, title_text), cut in zip(reversed(windows), reversed(cuts)):
+        counts = counts + _wind_rose_counts(codes[cut:end])
+        end = cut
+        # A window without any rows stays an empty figure
+        fig = _wind_rose_figure(counts) if cut < len(codes) else go.Figure()
+        # Update the title of the wind rose
+        fig.update_layout(title=dict(text=title_text, font=title_font))
+        figures.append(fig)
+    return figures[::-1]
 
 def create_reflected_wind_direction_figure(mean_wind_speed_kmh, mean_direction):
     """
@@ -1378,12 +1626,56 @@ def create_reflected_wind_direction_figure(mean_wind_speed_kmh, mean_direction):
     return fig
 
 
+# Last rendered content of each CSV tab and the CSV mtime it was built from,
+# shared by every client so a figure is built once per data change
+_RENDERED_TABS = {}
+
+# Single-graph tabs whose layout does not depend on the data. On a timer tick
+# only the new trace data is sent to the browser for these.
+PATCHABLE_TABS = {
+    "Temperature", "Humidity", "Atmospheric Pressure", "Light Intensity",
+    "UV Index", "Rain Accumulation"
+}
+
+# Tabs whose content is built only from the CSV data
+CSV_TABS = {
+    "Dashboard", "Weather Summary", "Temperature", "Humidity", "Atmospheric Pressure",
+    "Light Intensity", "UV Index", "Wind Rose", "Wind Time Series",
+    "Air Quality Monitoring", "Rain Accumulation"
+}
+
+def _tab_update(tab, content):
+    """
+    Return what render_content sends for the tab: the full content, or on a timer
+    tick for a PATCHABLE_TABS tab, a Patch replacing only the figure's traces.
+    """
+    if tab not in PATCHABLE_TABS or dash.ctx.triggered_id != "interval":
+        return content
+    # The browser already shows this tab's graph (inside dcc.Loading)
+    patch = Patch()
+    patch["props"]["children"]["props"]["figure"]["data"] = content.children.figure.to_plotly_json()["data"]
+    return patch
+
 @app.callback(
-    Output("tabs-content", "children"),
+    [Output("tabs-content", "children"),
+     Output("csv-mtime", "data")],
     [Input("tabs", "value"),
-     Input("interval", "n_intervals")]
+     Input("interval", "n_intervals")],
+    [State("csv-mtime", "data")]
 )
-def render_content(tab, n_intervals):
+def render_content(tab, n_intervals, last_mtime):
+    # On a timer tick, leave the figures alone if no new sample has been written
+    try:
+        mtime = os.stat(CSV_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    if dash.ctx.triggered_id == "interval" and tab in CSV_TABS and mtime == last_mtime:
+        raise PreventUpdate
+
+    # Another client already built this tab from the same CSV: send that instead
+    if tab in CSV_TABS and tab in _RENDERED_TABS and _RENDERED_TABS[tab][0] == mtime:
+        return _tab_update(tab, _RENDERED_TABS[tab][1]), mtime
+
     df = load_data()
 
     # 1. Dashboard tab: Thermometer + Wind Arrow
@@ -1392,8 +1684,8 @@ def render_content(tab, n_intervals):
         thermo_fig = create_thermometer_dashboard(df)
 
         # 2) Filter data for last 10 minutes
-        now_utc = datetime.now(ZoneInfo("UTC"))
-        df_last10 = df[df["timestamp"] >= now_utc - timedelta(minutes=10)]
+        now_utc = datetime.now(timezone.utc)
+        df_last10 = _rows_since(df, now_utc - timedelta(minutes=10))
 
         # 3) Check columns
         if (
@@ -1440,17 +1732,15 @@ def render_content(tab, n_intervals):
     elif tab == "UV Index":
         content = dcc.Graph(figure=create_line_figure(df, ["UV Index (GY-8511)"], "UV Index", ""), className="dash-graph")
     elif tab == "Wind Rose":
-        wind_rose_24 = dcc.Graph(
-            figure=create_wind_rose_range(df, timedelta(hours=24), "Last 24 hours"),
-            className="dash-graph"
-        )
-        wind_rose_1 = dcc.Graph(
-            figure=create_wind_rose_range(df, timedelta(hours=1), "Last 1 hour"),
-            className="dash-graph"
-        )
-        wind_rose_10 = dcc.Graph(
-            figure=create_wind_rose_range(df, timedelta(minutes=10), "Last 10 minutes"),
-            className="dash-graph"
+        # Bin the rows once and take one "now" for all three windows
+        now_utc = datetime.now(timezone.utc)
+        wind_roses = create_wind_rose_ranges(_prep_wind(df), [
+            (now_utc - timedelta(hours=24), "Last 24 hours"),
+            (now_utc - timedelta(hours=1), "Last 1 hour"),
+            (now_utc - timedelta(minutes=10), "Last 10 minutes")
+        ])
+        wind_rose_24, wind_rose_1, wind_rose_10 = (
+            dcc.Graph(figure=fig, className="dash-graph") for fig in wind_roses
         )
         content = html.Div(
             [wind_rose_24, wind_rose_1, wind_rose_10],
@@ -1477,7 +1767,7 @@ def render_content(tab, n_intervals):
     elif tab == "Cloud Camera":
         img_src = get_latest_cloud_camera_image()
         if img_src is None:
-            content = html.Div("No image found in whole_sky_camera folder.", style={"textAlign": "center", "padding": "20px"})
+            content = html.Div(f"No image found in {CLOUD_CAMERA_DIR} folder.", style={"textAlign": "center", "padding": "20px"})
         else:
             content = html.Div(
                 html.Img(src=img_src, style={"maxWidth": "100%", "height": "auto"}),
@@ -1513,20 +1803,45 @@ def render_content(tab, n_intervals):
     else:
         content = html.Div("No content available.", style={"textAlign": "center"})
 
-    return dcc.Loading(
+    content = dcc.Loading(
         children=content,
         type="circle",
         fullscreen=False
     )
+    if tab in CSV_TABS:
+        _RENDERED_TABS[tab] = (mtime, content)
+    return _tab_update(tab, content), mtime
 
 # New callback to update station status and last data timestamp
 
-@app.callback(Output("station-status", "children"), [Input("interval", "n_intervals")])
-def update_station_status(n_intervals):
+@app.callback(
+    [Output("station-status", "children"),
+     Output("status-key", "data")],
+    [Input("interval", "n_intervals")],
+    [State("status-key", "data")]
+)
+def update_station_status(n_intervals, last_key):
+    # The status only changes with new data or, through the online/offline check
+    # and the moon info, from one minute to the next
+    try:
+        mtime = os.stat(CSV_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    key = [mtime, int(time.time() // 60)]
+    if key == last_key:
+        raise PreventUpdate
+    return _station_status(*key), key
+
+@lru_cache(maxsize=1)
+def _station_status(mtime, minute):
+    """Build the status panel; the arguments only key the cache shared by all clients."""
     df = load_data()
-    if df.empty or df["timestamp"].max() is None:
+    # Look the newest timestamp up once (a missing one is NaT, never None)
+    last_ts = df["timestamp"].iloc[-1] if not df.empty else pd.NaT
+    if not df.empty and not df["timestamp"].is_monotonic_increasing:
+        last_ts = df["timestamp"].max()
+    if pd.isna(last_ts):
         return html.Div("No data available", style={"color": "gray"})
-    last_ts = df["timestamp"].max()
     last_ts_greece = last_ts.astimezone(ZoneInfo("Europe/Athens"))
     now_greece = datetime.now(ZoneInfo("Europe/Athens"))
     diff_minutes = (now_greece - last_ts_greece).total_seconds() / 60.0
@@ -1583,5 +1898,8 @@ def update_station_status(n_intervals):
         lightning_info, rain_info, moon_info],
         style={"fontSize": "16px", "fontFamily": "Roboto, sans-serif", "padding": "20px", "border": "1px solid #ccc", "borderRadius": "10px", "margin": "0 auto", "maxWidth": "500px", "backgroundColor": "rgba(255, 255, 255, 0.8)", "marginBottom": "30px", "textAlign": "center"})
 
+# Development server. For several viewers the app can instead be served by gunicorn
+# with one gevent worker (the caches above are per process), from this directory:
+#   gunicorn timeseries_plotly_optimised:server -k gevent -w 1 -b 0.0.0.0:8050
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8050, debug=False)
@@ -2,10 +2,18 @@
 import minimalmodbus
 import serial
 import time
-import csv
 import os
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Each row is handed to the OS as soon as it is written, so the other readers of the
+# shared CSV see it right away; it is forced out to the SD card once every FLUSH_EVERY samples
+FLUSH_EVERY = 10
+# Columns 2-11 of a wind row are always empty
+EMPTY_MID = "," * 10
+
 def setup_instrument(port, slave_address=1, baudrate=4800):
     """Initialize a Modbus instrument on the given port."""
     instrument = minimalmodbus.Instrument(port, slave_address)
@@ -15,16 +23,27 @@ def setup_instrument(port, slave_address=1, baudrate=4800):
     instrument.serial.stopbits = 1
     instrument.serial.timeout  = 1  # seconds
     instrument.mode = minimalmodbus.MODE_RTU
+    # Keep the port open between calls; instruments on the same port share it
+    instrument.close_port_after_each_call = False
     return instrument
 
+def handle_sigterm(signum, frame):
+    # Exit through the normal path so the CSV is flushed and closed
+    sys.exit(0)
+
 def main():
     # Fixed ports based on your discovery:
     anemometer_port = '/dev/ttyUSB0'  # Anemometer: wind speed sensor
     wind_vane_port   = '/dev/ttyUSB3'  # Wind vane: wind direction sensor
+    # Modbus slave addresses. To run both sensors on one RS-485 adapter, wire them to
+    # the same bus, give the wind vane its own address (e.g. 2) and set both ports
+    # above to that adapter.
+    anemometer_address = 1
+    wind_vane_address  = 1
 
-    # Set up instruments
-    anemometer = setup_instrument(anemometer_port)
-    wind_vane  = setup_instrument(wind_vane_port)
+    # Set up instruments (minimalmodbus reuses one serial object per port name)
+    anemometer = setup_instrument(anemometer_port, anemometer_address)
+    wind_vane  = setup_instrument(wind_vane_port, wind_vane_address)
 
     # CSV file path
     data_file = "/home/dimitris/weather_station/weather_station_data.csv"
@@ -34,42 +53,68 @@ def main():
     # If the file doesn't exist, create it and write a header row (optional)
     if not os.path.exists(data_file):
         with open(data_file, mode='w', newline='') as f:
-            writer = csv.writer(f)
             # Header: Column 1 is Timestamp, columns 2-11 are empty placeholders,
             # column 12: Wind Speed, column 13: Wind Direction
-            header = ["Timestamp"] + [""] * 10 + ["Wind Speed", "Wind Direction"]
-            writer.writerow(header)
+            f.write(f"Timestamp{EMPTY_MID},Wind Speed,Wind Direction\r\n")
 
     print("Starting sensor polling and logging every 31 seconds. Press Ctrl+C to exit.\n")
 
-    while True:
-        try:
-            # Read from the anemometer: register 0 holds wind speed (value is 10x actual m/s)
-            raw_speed = anemometer.read_register(0, 0)
-            wind_speed = raw_speed / 10.0
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    # Keep the CSV open for the whole run instead of reopening it for every sample.
+    # Line buffered: every complete row is written to the file immediately.
+    f = open(data_file, mode='a', newline='', buffering=1)
+    rows_since_fsync = 0
+    # One worker per serial port: on a shared bus the two requests must go one after the other
+    executor = ThreadPoolExecutor(max_workers=1 if anemometer_port == wind_vane_port else 2)
+    try:
+        while True:
+            try:
+                # Sensors on separate serial ports are read at the same time
+                speed_future = executor.submit(anemometer.read_register, 0, 0)
+                degree_future = executor.submit(wind_vane.read_register, 1, 0)
 
-            # Read from the wind vane: register 1 holds wind direction in degrees
-            raw_degree = wind_vane.read_register(1, 0)
-            # Calibrate wind direction: subtract 45 degrees and apply modulo 360.
-            calibrated_degree = (raw_degree - 90) % 360
+                # Read from the anemometer: register 0 holds wind speed (value is 10x actual m/s)
+                try:
+                    raw_speed = speed_future.result(timeout=2)
+                    speed_str = f"{raw_speed / 10.0:.1f}"
+                except Exception as e:
+                    print(f"Error reading anemometer: {e}")
+                    speed_str = ""
 
-            # Get the current timestamp (UTC e.g., "2024-05-20 12:00:00")
-            timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+                # Read from the wind vane: register 1 holds wind direction in degrees
+                try:
+                    raw_degree = degree_future.result(timeout=2)
+                    # Calibrate wind direction: subtract 45 degrees and apply modulo 360.
+                    degree_str = str((raw_degree - 90) % 360)
+                except Exception as e:
+                    print(f"Error reading wind vane: {e}")
+                    degree_str = ""
 
-            # Prepare a row with 13 columns:
-            # Column 1: timestamp, columns 2-11: empty, column 12: wind_speed, column 13: calibrated_degree
-            row = [timestamp] + [""] * 10 + [wind_speed, calibrated_degree]
+                # Skip the sample only if both sensors failed; otherwise log the one that worked
+                if speed_str or degree_str:
+                    # Get the current timestamp (UTC e.g., "2024-05-20 12:00:00")
+                    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
-            # Append the row to the CSV file
-            with open(data_file, mode='a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(row)
+                    # Append a row with 13 columns to the CSV buffer:
+                    # Column 1: timestamp, columns 2-11: empty, column 12: wind_speed, column 13: calibrated_degree
+                    # (same bytes csv.writer produced, including the \r\n line ending)
+                    f.write(f"{timestamp}{EMPTY_MID},{speed_str},{degree_str}\r\n")
+                    rows_since_fsync += 1
+                    if rows_since_fsync >= FLUSH_EVERY:
+                        os.fsync(f.fileno())
+                        rows_since_fsync = 0
 
-            print(f"{timestamp} -> Wind Speed: {wind_speed:.1f}, Wind Direction: {calibrated_degree}")
-        except Exception as e:
-            print(f"Error reading sensors or writing file: {e}")
+                    print(f"{timestamp} -> Wind Speed: {speed_str or 'N/A'}, Wind Direction: {degree_str or 'N/A'}")
+            except Exception as e:
+                print(f"Error reading sensors or writing file: {e}")
 
-        time.sleep(31)
+            time.sleep(31)
+    finally:
+        executor.shutdown(wait=False)
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
 
 if __name__ == "__main__":
     main()
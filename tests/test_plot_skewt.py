@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import metpy.calc as mpcalc
+from metpy.units import units
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from plot_skewt import _parcel_paths  # noqa: E402
+
+
+def _sounding(surface_td_missing):
+    """Synthetic sounding in hPa/degC, with the surface dewpoint optionally missing."""
+    p = np.linspace(1010, 100, 60)
+    height = 44330 * (1 - (p / 1013.25) ** 0.1903)
+    T = 30 - 6.5 * height / 1000
+    Td = T - np.linspace(3, 30, 60)
+    if surface_td_missing:
+        Td[0] = np.nan
+    return p, T, Td
+
+
+def _check_parcel_paths(surface_td_missing):
+    p_T, T, Td = _sounding(surface_td_missing)
+    has_td = ~np.isnan(Td)
+    p = p_T[has_td] * units.hPa
+    sfc_t, sfc_td = np.mean(T[has_td][:3]) * units.degC, np.mean(Td[has_td][:3]) * units.degC
+
+    parcel_prof, li_levels, parcel_prof_full = _parcel_paths(p, p_T, Td, sfc_t, sfc_td)
+
+    # The parcel is lifted from p[0], the lowest level with both T and Td
+    expected = mpcalc.parcel_profile(p, sfc_t, sfc_td).to('degC')
+    np.testing.assert_allclose(parcel_prof.m, expected.m, atol=1e-6)
+    assert p_T[li_levels][0] == p[0].m
+    assert len(parcel_prof_full) == li_levels.sum()
+
+
+def test_parcel_paths_with_surface_dewpoint():
+    _check_parcel_paths(surface_td_missing=False)
+
+
+def test_parcel_paths_without_surface_dewpoint():
+    _check_parcel_paths(surface_td_missing=True)
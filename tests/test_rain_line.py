@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from timeseries_plotly_optimised import TS_MS_COL, _add_epoch_ms, _rain_line_points  # noqa: E402
+
+RAIN_COL = "Rain Accumulation (SEN0575) (mm)"
+
+
+def _frame(times, totals):
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime(times, utc=True),
+        RAIN_COL: totals,
+    })
+    _add_epoch_ms(df)
+    return df
+
+
+def test_one_point_per_bucket_at_its_latest_reading():
+    df = _frame(
+        ["2026-10-15 10:01:00", "2026-10-15 10:03:00", "2026-10-15 10:04:00",
+         "2026-10-15 10:08:00", "2026-10-15 10:12:00"],
+        [0.2, np.nan, 0.4, 0.6, 0.6],
+    )
+    x, y = _rain_line_points(df, RAIN_COL)
+    np.testing.assert_array_equal(x, df[TS_MS_COL].to_numpy()[[3, 4]])
+    np.testing.assert_allclose(y, [0.6, 0.6])
+
+
+def test_midnight_reset_starts_a_new_bucket():
+    df = _frame(
+        ["2026-10-15 23:52:00", "2026-10-15 23:58:00", "2026-10-16 00:01:00",
+         "2026-10-16 00:05:00"],
+        [3.0, 3.2, 0.0, 0.2],
+    )
+    x, y = _rain_line_points(df, RAIN_COL)
+    # The day's last total, then the new day's total; the reset is not carried over
+    np.testing.assert_array_equal(x, df[TS_MS_COL].to_numpy()[[1, 3]])
+    np.testing.assert_allclose(y, [3.2, 0.2], rtol=1e-6)
+
+
+def test_out_of_order_rows():
+    df = _frame(
+        ["2026-10-15 10:08:00", "2026-10-15 10:01:00", "2026-10-15 10:04:00"],
+        [0.6, 0.2, 0.4],
+    )
+    x, y = _rain_line_points(df, RAIN_COL)
+    np.testing.assert_array_equal(x, df[TS_MS_COL].to_numpy()[[0]])
+    np.testing.assert_allclose(y, [0.6], rtol=1e-6)